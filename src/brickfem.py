@@ -9,11 +9,38 @@ from abaqus import *
 from abaqusConstants import *
 from caeModules import *
 import numpy as np
-import os, random, json, copy, shutil, subprocess
+import os, random, json, copy, shutil, subprocess, numbers
+try:
+    from shutil import which
+except ImportError:
+    # Python 2 (Abaqus < 2024)
+    from distutils.spawn import find_executable as which
 
 TOL = 1e-3
 DIR0 = os.path.abspath('')
 
+# possible brick types in the `bricks` sub-dictionary of the assembly
+BRICK_TYPES = ('regular', 'plate', 'tile', 'base-plate')
+
+# contact faces (surface names) of the bricks, referenced by their index in the contact pairs
+FACES = ('x0', 'x1', 'z0', 'z1', 'bot', 'top')
+
+# displacements and rotations that can be applied in `loads_rp`
+LOAD_KEYS = ('ux', 'uy', 'uz', 'rotx', 'roty', 'rotz')
+
+# number format of the history output files (the odb stores single precision values)
+HO_FMT = '%.7g'
+
+# endings of the Abaqus scratch files removed by `remove_files` (some only with 'ms.'
+# because the files of the first, implicit model are needed to load its results)
+SCRATCH_ENDS = (('.com', '.sim', '.SMABulk', '.pac', '.abq', '.dmp', '.exception', '.simdir',
+                 'ms.mdl', 'ms.prt', 'ms.res', 'ms.sel', 'ms.stt') +
+                tuple('.' + str(i) for i in range(1, 21)))
+
+# explicit models that already contain the parts imported from an implicit job:
+# {absolute odb path: (model_name, inst_names)}, see `load_impl_to_expl`
+ODB_PARTS = {}
+
 # default general Lego brick geometry parameters
 
 lego_geom = {'b, b_gap, b_wall': (8., 0.1, 1.6),
@@ -29,30 +56,22 @@ def remove_files(dir0,type_list=('.log', '.msg')):
     """Remove all files in the directory dir that end with the strings
     given in type_list and additional predefined strings. Some only with
     'ms.mdl' because they are needed for the first, implicit model to
-    load the results"""
-    type0_list = ('.com', '.sim', '.SMABulk', '.pac', '.abq',
-                  '.dmp', '.exception', '.simdir', 'ms.mdl', 'ms.prt',
-                  'ms.res', 'ms.res', 'ms.sel', 'ms.stt')
-    
-    # all files in the folder
-    file_list = [i for i in os.listdir(dir0) if '.' in i]
-
-    # number-Types
-    number_list = tuple('.'+str(i) for i in range(1,21))
+    load the results (see `SCRATCH_ENDS`)"""
+    # all endings to remove (str.endswith checks them at once)
+    end_strs = SCRATCH_ENDS + tuple(type_list)
 
     # select files
-    for file_name in file_list:
-        for end_str in (type0_list + type_list + number_list):
-            if file_name.endswith(end_str):
-                try:
-                    os.remove(file_name)
-                except:
-                    None
+    for file_name in os.listdir(dir0):
+        if file_name.endswith(end_strs):
+            try:
+                os.remove(os.path.join(dir0, file_name))
+            except OSError:
+                pass
     return
 
 
-def run_model(model, job_name, n_proc=4):
-    """Run Abaqus model with a job called job_name using n_proc processors. Use double precision.
+def run_model(model, job_name, n_proc=4, if_wait=1, precision=DOUBLE_PLUS_PACK):
+    """Run Abaqus model with a job called job_name using n_proc processors. Use double precision by default (precision: Abaqus/Explicit precision, e.g. SINGLE). For `if_wait==0`, the job is only submitted (see `wait_for_jobs`). Returns the job.
     """
     # if job_name is empty, just use the model name
     if job_name == '':
@@ -62,21 +81,90 @@ def run_model(model, job_name, n_proc=4):
     mdb.saveAs(pathName=model.name + '.cae')
     job = mdb.Job(model=model.name, name=job_name, type=ANALYSIS,
                   multiprocessingMode=THREADS, numCpus=n_proc,
-                  explicitPrecision=DOUBLE_PLUS_PACK, 
+                  explicitPrecision=precision, 
                   nodalOutputPrecision=FULL, numDomains=n_proc)
     job.submit(consistencyChecking=OFF)
+    if if_wait:
+        wait_for_jobs([job])
+    return job
+
+
+def wait_for_jobs(jobs):
+    """Wait until all submitted Abaqus jobs in the list jobs have finished.
+    """
     # waitForCompletion() crashes, if run interactively
     #  --> try opening window to manually check when job is finished
     try:
         getWarningReply('Wait until job has finished (see .sta file), then press Yes.',buttons=(YES,NO))
     except:
-        job.waitForCompletion()
+        for job in jobs:
+            job.waitForCompletion()
     return
 
+def check_assembly(assembly):
+    """Check the `assembly` dictionary before the Abaqus model is created, so that typos are found before the time-consuming model generation starts. Raises a ValueError that describes the first error found.
+
+    Args:
+        assembly (dict): The setup of the Lego set defining bricks used (sub-dictionary `bricks`), part positions (`parts`), boundary conditions (`bc`), and loads applied on sets (`loads_rp`)
+    """
+    for key in ('name', 'bricks', 'parts', 'bc', 'loads_rp', 'mesh_size', 'mu'):
+        if key not in assembly:
+            raise ValueError("assembly: key '" + key + "' is missing")
+    
+    # bricks: type and number of studs
+    for i_brick, brick in assembly['bricks'].items():
+        brick_str = "assembly['bricks'][" + repr(i_brick) + "]"
+        for key in ('type', 'nx', 'nz'):
+            if key not in brick:
+                raise ValueError(brick_str + ": key '" + key + "' is missing")
+        if brick['type'] not in BRICK_TYPES:
+            raise ValueError(brick_str + ": type must be one of " + str(BRICK_TYPES))
+        if int(brick['nx']) != brick['nx'] or int(brick['nz']) != brick['nz'] or min(brick['nx'], brick['nz']) < 1:
+            raise ValueError(brick_str + ": nx and nz must be integers >= 1")
+    
+    # parts: integer part id (stored in the contact pair array), existing brick_id and location (x,y,z)
+    for i_part, part in assembly['parts'].items():
+        part_str = "assembly['parts'][" + repr(i_part) + "]"
+        if not isinstance(i_part, numbers.Integral):
+            raise ValueError(part_str + ": the part ids must be integers (keys read from a json file are strings)")
+        if part.get('brick_id') not in assembly['bricks']:
+            raise ValueError(part_str + ": brick_id " + repr(part.get('brick_id')) + " is not in assembly['bricks']")
+        if np.shape(part.get('loc')) != (3,) or np.asarray(part['loc']).dtype.kind not in 'iuf':
+            raise ValueError(part_str + ": loc must be (x,y,z)")
+    
+    # boundary conditions and loads: existing part_id and a set name
+    for sub_name in ('bc', 'loads_rp'):
+        for i, sub_par in assembly[sub_name].items():
+            sub_str = "assembly['" + sub_name + "'][" + repr(i) + "]"
+            if sub_par.get('part_id') not in assembly['parts']:
+                raise ValueError(sub_str + ": part_id " + repr(sub_par.get('part_id')) + " is not in assembly['parts']")
+            if 'set_name' not in sub_par:
+                raise ValueError(sub_str + ": key 'set_name' is missing")
+    return
+
+
+def is_ini_valid(model_name, assembly, lego_geom, run_dir=''):
+    """Check if the results of the clamping steps in the directory `run_dir` (default: the current directory) can be reused for a new explicit load step: The result files `model_name`.odb and `model_name`.res must exist and `_dict-assembly.json` must contain the same `assembly` and `lego_geom`.
+
+    Returns:
+        int: 1 if the clamping results can be reused, otherwise 0
+    """
+    json_name = os.path.join(run_dir, '_dict-assembly.json')
+    if not (os.path.exists(os.path.join(run_dir, model_name + '.odb'))
+            and os.path.exists(os.path.join(run_dir, model_name + '.res')) and os.path.exists(json_name)):
+        return 0
+    
+    with open(json_name, 'r') as f:
+        dict_old = json.load(f)
+    
+    # compare after a json round trip: keys become strings and tuples become lists
+    dict_new = json.loads(json.dumps({'lego_geom': lego_geom, 'assembly': assembly}))
+    return int(dict_old == dict_new)
+
 # Draw the Lego(r) parts and widen their cavities -----------------------------------
 
 def make_middle_pos(x_arr, z_arr):
-    """Create mid positions between the points in a regular x-z grid and mid positions every other stud for the bottom walls in the cavities.
+    """Create mid positions between the points in an x-z grid and mid positions every other stud for the bottom walls in the cavities.
 
     Args:
     x_arr (np.ndarray): Array of x positions of studs
@@ -86,27 +174,28 @@ def make_middle_pos(x_arr, z_arr):
     x_mid_arr (np.array): Mid positions in x direction, len(x_mid_arr) = len(x_arr)-1
     z_mid_arr (np.array): Mid positions in z direction, len(z_mid_arr) = len(z_arr)-1
     """
-    if len(x_arr) == 1:
-        if len(z_arr) == 1:
-            # if only 1x1 brick: no mid positions
-            return None, None
-        else:
-            # for 1xn brick: no x-mid positions
-            delta_z = z_arr[1] - z_arr[0]
-            z_mid_arr = z_arr[:-1] + delta_z / 2.
-            return None, z_mid_arr
-    elif len(z_arr) == 1:
-        # for nx1 brick: no z-mid positions
-        delta_x = x_arr[1] - x_arr[0]
-        x_mid_arr = x_arr[:-1] + delta_x / 2.
-        return x_mid_arr, None
-    else:
-        delta_x = x_arr[1] - x_arr[0]
-        delta_z = z_arr[1] - z_arr[0]
-        #
-        x_mid_arr = x_arr[:-1] + delta_x / 2.
-        z_mid_arr = z_arr[:-1] + delta_z / 2.
-    return x_mid_arr, z_mid_arr
+    def get_mid(arr):
+        # no mid positions for a single stud in that direction
+        if len(arr) < 2:
+            return None
+        return (arr[1:] + arr[:-1]) / 2.
+    
+    return get_mid(x_arr), get_mid(z_arr)
+
+
+def make_stud_pos(nx, nz, b):
+    """Create the x-z positions of the stud centers of a brick, with the origin in the center of the upper left stud.
+
+    Args:
+    nx (int): Number of studs in x direction
+    nz (int): Number of studs in z direction
+    b (float): Distance between two studs
+
+    Returns:
+    stud_pos (np.ndarray): Stud positions [[x_i, z_i],...] with shape (nx*nz, 2), x changes first
+    """
+    x_grid, z_grid = np.meshgrid(np.arange(nx) * b, np.arange(nz) * b)
+    return np.column_stack((x_grid.ravel(), z_grid.ravel()))
 
 
 def make_u_nodes(p, nx, nz, b, r_stud, h_stud, mesh_size):
@@ -125,52 +214,32 @@ def make_u_nodes(p, nx, nz, b, r_stud, h_stud, mesh_size):
     Returns:
         ndarray: The node label, the radial displacement, and the negative angle as [[i_node,u_r,-u_ang],...]
     """
-    # calculate the displacements of nodes that may contact studs
-    # to establish initial contact
-    def get_overlap_nodes(c_arr, x0, z0, r_stud, h_stud, mesh_size):
-        """Calculate radial displacement to resolve contact penetration.
-
-        Args:
-            c_arr (ndarray): Array of node labels and node coordinates [[n_i,x_i,y_i,z_i],...]
-            x0 (float): x center of stud
-            z0 (float): z center of stud
-            r_stud (float): Stud radius
-            h_stud (float): Stud height
-
-        Returns:
-            list: The node label, the radial displacement, and the negative angle as [[i_node,u_r,-u_ang],...]
-        """
-        # for one stud: get Nodes that overlap
-        # (including their penetration and direction)
-        c_distance = c_arr - [0, x0, z0, 0]
-        c_radius = (c_distance[:, 1] ** 2 + c_distance[:, 2] ** 2) ** 0.5
-        c_angle = np.arctan2(c_distance[:, 2], c_distance[:, 1])
-        # select overlapping nodes
-        cyl_sel = (c_radius < r_stud) * (c_distance[:, -1] <= h_stud + mesh_size/2.)
-        # obtain node number, penetration, angle (rad)
-        n_arr = c_arr[cyl_sel][:, 0]
-        r_arr = c_radius[cyl_sel] - r_stud
-        ang_arr = c_angle[cyl_sel] * 180 / np.pi
-        return list(np.column_stack((n_arr, -r_arr, ang_arr)))
-
     # output the nodes for the initial displacements
     nodes_cont_bot = p.sets['cont-bot-touch'].nodes
     
-    nodes_cont_bot = np.array([np.array([i.label] + list(i.coordinates), dtype=float)
-                               for i in nodes_cont_bot])
+    nodes_cont_bot = np.column_stack(([i.label for i in nodes_cont_bot],
+                                      [i.coordinates for i in nodes_cont_bot])).astype(float)
     
-    move_nodes = []
-    for j in range(nz):
-        for i in range(nx):
-            move_nodes += get_overlap_nodes(nodes_cont_bot, b * i, b * j,
-                                            r_stud, h_stud, mesh_size)
-    move_nodes = np.array(move_nodes)
-
-    # create node sets
-    for n_label_i in move_nodes[:, 0]:
-        n_label = int(n_label_i)
-        p.Set(name='x-n' + str(n_label), nodes=p.nodes[n_label - 1:n_label])
+    # only nodes up to the stud height can overlap with a stud
+    nodes_cont_bot = nodes_cont_bot[nodes_cont_bot[:, -1] <= h_stud + mesh_size/2.]
     
+    # calculate the displacements of nodes that may contact studs
+    # to establish initial contact: distances of all nodes (columns)
+    # to all stud centers (rows) at once
+    stud_pos = make_stud_pos(nx, nz, b)
+    dx = nodes_cont_bot[:, 1] - stud_pos[:, :1]
+    dz = nodes_cont_bot[:, 2] - stud_pos[:, 1:]
+    c_radius = np.hypot(dx, dz)
+    
+    # select overlapping nodes (including their penetration and direction),
+    # ordered by stud and then by node
+    cyl_sel = c_radius < r_stud
+    i_node = np.nonzero(cyl_sel)[1]
+    
+    # obtain node number, penetration, angle (deg)
+    move_nodes = np.column_stack((nodes_cont_bot[i_node, 0], r_stud - c_radius[cyl_sel],
+                                  np.arctan2(dz[cyl_sel], dx[cyl_sel]) * 180 / np.pi))
+
     # for debugging
     #np.savetxt('nodes_to_move_{}x{}.dat'.format(nz, nx), move_nodes)
     return move_nodes
@@ -178,6 +247,27 @@ def make_u_nodes(p, nx, nz, b, r_stud, h_stud, mesh_size):
 
 # Find interacting Lego(r) parts ----------------------------------------------------
 
+def make_parts_dict(brick_ids, locs, colors=None):
+    """Create the `parts` dictionary of the assembly from arrays of the brick ids, locations, and (optionally) colors of the parts. The parts are numbered from 1 in the order of the arrays.
+
+    Args:
+        brick_ids (array-like): The brick id of each part, shape (n,)
+        locs (array-like): The location of each part, shape (n,3)
+        colors (array-like, optional): The color of each part, shape (n,). Defaults to None.
+
+    Returns:
+        dict: The `parts` dictionary, e.g. {1:{'brick_id':1, 'loc':(0,0,0), 'c':'Yellow'},...}
+    """
+    locs = np.asarray(locs, dtype=float)
+    parts = {}
+    for i, (i_brick, loc) in enumerate(zip(brick_ids, locs.tolist())):
+        # plain Python types, so that the dictionary can be written to json
+        parts[i + 1] = {'brick_id': int(i_brick), 'loc': tuple(loc)}
+        if colors is not None:
+            parts[i + 1]['c'] = str(colors[i])
+    return parts
+
+
 def make_brick_lists(brick, h, h_top):
     """Make arrays of the (ix,iz) positions of the studs of a brick and the y_range of the side wall of the brick
 
@@ -195,10 +285,8 @@ def make_brick_lists(brick, h, h_top):
     nx, nz = brick['nx'], brick['nz']
 
     # list of stud positions (in (8 mm))
-    brick_list = ()
-    for ix in range(1, nx+1):
-        for iz in range(1, nz+1):
-            brick_list += ((ix, iz),)
+    ix, iz = np.mgrid[1:nx+1, 1:nz+1]
+    brick_list = np.column_stack((ix.ravel(), iz.ravel()))
     
     # y range (without studs)
     if b_type == 'regular':
@@ -207,7 +295,7 @@ def make_brick_lists(brick, h, h_top):
         y_range = (-h_top, 0)
     else:
         y_range = (0, h/3.)
-    return np.array(brick_list), np.array(y_range)
+    return brick_list, np.array(y_range)
 
 
 def make_parts(bricks, parts, b, h, h_top, if_plot=0):
@@ -226,28 +314,45 @@ def make_parts(bricks, parts, b, h, h_top, if_plot=0):
     """
     # load parts from 'parts' dictionary:
     # add y_range and stud_list to dictionary
-    if if_plot:
-        fig, (ax1,ax2) = plt.subplots(nrows=2, sharex=True)
 
-    # make all parts
+    # stud lists and y ranges of the used bricks (without moving them to position):
+    # only once for bricks with the same type and size
+    brick_keys = {i_brick: (brick['type'], brick['nx'], brick['nz'])
+                  for i_brick, brick in bricks.items()}
+    brick_lists = {}
     for i_part in parts.keys():
         i_brick = parts[i_part]['brick_id']
-        loc = parts[i_part]['loc']
-        brick_list, y_range = make_brick_lists(bricks[i_brick], h, h_top)
-        brick_list += (int(loc[0]/b), int(loc[2]/b))
-        y_range += loc[1]
-
-        # add information to ass dict
-        parts[i_part]['stud_list'] = np.copy(brick_list)
-        parts[i_part]['y_range'] = np.copy(y_range)
-        
-        # rough plot of the part positions (y over x and z over x)
-        if if_plot:
+        if brick_keys[i_brick] not in brick_lists:
+            brick_lists[brick_keys[i_brick]] = make_brick_lists(bricks[i_brick], h, h_top)
+            for arr in brick_lists[brick_keys[i_brick]]:
+                arr.setflags(write=False)
+
+    # offsets of all parts at once: stud positions (in (8 mm)) and y coordinate
+    part_ids = list(parts.keys())
+    locs = np.array([parts[i_part]['loc'] for i_part in part_ids], dtype=float)
+    stud_offsets = (locs[:, [0, 2]] / b).astype(int)
+
+    # make all parts
+    for i_part, stud_offset, loc in zip(part_ids, stud_offsets, locs):
+        brick_list0, y_range0 = brick_lists[brick_keys[parts[i_part]['brick_id']]]
+        brick_list = brick_list0 + stud_offset
+        y_range = y_range0 + loc[1]
+
+        # add information to ass dict (only read from now on)
+        brick_list.setflags(write=False)
+        y_range.setflags(write=False)
+        parts[i_part]['stud_list'] = brick_list
+        parts[i_part]['y_range'] = y_range
+    
+    # rough plot of the part positions (y over x and z over x)
+    if if_plot:
+        import matplotlib.pyplot as plt
+        fig, (ax1,ax2) = plt.subplots(nrows=2, sharex=True)
+        for part in parts.values():
+            brick_list, y_range = part['stud_list'], part['y_range']
             ax1.plot(list(brick_list[:,0])*2, [y_range[0]]*len(brick_list)+
                      [y_range[1]]*len(brick_list), 'x-', markersize=20)
             ax2.plot(brick_list[:,0], brick_list[:,1], 'x-', markersize=20)
-    
-    if if_plot:
         ax1.set_ylabel('y (9.6 mm)')
         ax2.set_ylabel('z (8 mm)')
         plt.xlabel('x (8 mm)')
@@ -268,7 +373,7 @@ def check_two_parts(part1, part2, h_stud, b):
         (str, list, list, int)
         y_rel (str): The relative position of part 2 to part 1. Can be 'top', 'bottom', 'side' or 'none'.
         widen_list (list): (xi,z1) positions of cavities that should be widened for part2
-        side_list (list): [[str1,str2]] strings for contact surface names of part1 and part2, respectively
+        side_list (list): [[i_face1,i_face2]] indices of the contact surface names in `FACES` of part1 and part2, respectively
         if_stud_contact (int): One if at least one cavity of part2 is widened, otherwise 0
     """
     # if part1 and part2 are identical: return empty lists
@@ -298,25 +403,22 @@ def check_two_parts(part1, part2, h_stud, b):
     if_stud_contact = 0
 
     if y_rel == 'bot':
-        for s1 in s_list1:
-            for s2 in s_list2:
-                # check bottom positions that should be widened in first part
-                if list(s1) == list(s2):
-                    widen_list += [list(s1 - (int(loc[0] / b), int(loc[2] / b)))]
-                    if_stud_contact = 1
+        # check bottom positions that should be widened in first part:
+        # compare all studs of part1 (rows) with all studs of part2 (columns)
+        is_same = (s_list1[:, None, :] == s_list2[None, :, :]).all(axis=-1).any(axis=1)
+        widen_list = (s_list1[is_same] - (int(loc[0] / b), int(loc[2] / b))).tolist()
+        if_stud_contact = int(is_same.any())
 
     # check for side contact in x,z plane
     side_list = []
 
     if y_rel == 'side':
-        for s1 in s_list1:
-            for s2 in s_list2:
-                # only in positive direction: because checked from both sides
-                # (side contact not relevant for overlapping bricks)
-                if (s2 - s1)[0] == 1 and (s2-s1)[1] == 0:
-                    side_list += [['x1', 'x0']]
-                elif (s2 - s1)[1] == 1 and (s2-s1)[0] == 0:
-                    side_list += [['z1', 'z0']]
+        # only in positive direction: because checked from both sides
+        # (side contact not relevant for overlapping bricks)
+        s_diff = s_list2[None, :, :] - s_list1[:, None, :]
+        is_x = (s_diff[..., 0] == 1) * (s_diff[..., 1] == 0)
+        is_z = (s_diff[..., 0] == 0) * (s_diff[..., 1] == 1)
+        side_list = [[1, 0] if i_x else [3, 2] for i_x in is_x[is_x + is_z]]
     
     return y_rel, widen_list, side_list, if_stud_contact
 
@@ -332,7 +434,7 @@ def make_widen_cont(assembly, lego_geom, if_plot=0):
     Returns:
         (dict_widen, cont_list)
         dict_widen (dict): (xi,z1) positions of cavities that should be widened for all bricks
-        cont_list (list): [i_brick1, i_brick2, [str1, str2]]: Contact should be defined between the bricks with index `i_brick1` and `i_brick2` with their surfaces with string `str1` and `str2`, respectively. 
+        cont_list (ndarray): Rows [i_brick1, i_brick2, i_face1, i_face2]: Contact should be defined between the bricks with index `i_brick1` and `i_brick2` with their surfaces `FACES[i_face1]` and `FACES[i_face2]`, respectively. 
 
     Examples:
         lego_geom: {'b, b_gap, b_wall': (8., 0.1, 1.6),
@@ -351,37 +453,55 @@ def make_widen_cont(assembly, lego_geom, if_plot=0):
                         7: {'brick_id': 1, 'loc': (40, -9.6, 0)}}}
         dict_widen: {1: [[2, 1]], 2: [[1, 1], [2, 1]], 3: [[1, 1], [2, 1]], 4: [[1, 1]],
                      5: [], 6: [], 7: []}
-        cont_list: [[1, 2, ['x1', 'x0']], [1, 5, ['bot', 'top']], [2, 3, ['x1', 'x0']], [2, 5, ['bot', 'top']],
-                    [2, 6, ['bot', 'top']], [3, 4, ['x1', 'x0']], [3, 6, ['bot', 'top']], [3, 7, ['bot', 'top']],
-                    [4, 7, ['bot', 'top']], [5, 6, ['x1', 'x0']], [6, 7, ['x1', 'x0']]]
+        cont_list: [[1, 2, 1, 0], [1, 5, 4, 5], [2, 3, 1, 0], [2, 5, 4, 5], [2, 6, 4, 5], [3, 4, 1, 0],
+                    [3, 6, 4, 5], [3, 7, 4, 5], [4, 7, 4, 5], [5, 6, 1, 0], [6, 7, 1, 0]]
     """
     b, _, _ = lego_geom['b, b_gap, b_wall']
     h, h_stud, h_top = lego_geom['h, h_stud, h_top']
 
-    # flatten the cavity lists that should be widened
-    def flat_cavity(lists_0):
-        out_list = []
-        for i in lists_0:
-            out_list += i
-        return out_list
-
     # obtain all stud positions for widening (where studs will stick) and contact pairs
     parts = make_parts(assembly['bricks'], assembly['parts'], b, h, h_top, if_plot)
     
     dict_widen = {}
     cont_list = []
 
-    # check two parts each and fill the dict_widen dictionary and the cont list
-    for k_part in parts.keys():
-        dic_temp = {j:check_two_parts(parts[k_part], i, h_stud, b) for j, i in parts.items() if j != k_part}
-        #print(dic_temp)
-        widen_list = [i[1] for i in dic_temp.values() if i[1] != []]
-        dict_widen[k_part] = flat_cavity(widen_list)
+    # relative y positions of all parts at once (part1: rows, part2: columns), same
+    # conditions as in `check_two_parts`
+    part_ids = list(parts.keys())
+    y_ranges = np.array([parts[i_part]['y_range'] for i_part in part_ids], dtype=float)
+    y_lo1, y_hi1 = y_ranges[:, None, 0], y_ranges[:, None, 1]
+    y_lo2, y_hi2 = y_ranges[None, :, 0], y_ranges[None, :, 1]
+    is_top = (y_hi1 + h_stud > y_lo2) * (y_hi1 <= y_lo2 + TOL)
+    is_bot = (y_hi2 + h_stud > y_lo1) * (y_hi2 <= y_lo1 + TOL)
+    is_side = ((y_hi2 > y_lo1 + TOL) * (y_hi2 < y_hi1 + TOL) +
+               (y_lo2 < y_hi1 + TOL) * (y_lo2 > y_lo1 - TOL))
+    
+    # stud index ranges of all parts in the x-z plane (rows: [ix_min, iz_min, ix_max, iz_max]):
+    # studs of both parts can only be at the same or at neighbouring positions if these
+    # ranges overlap or touch
+    s_ranges = np.array([np.append(parts[i_part]['stud_list'].min(axis=0), parts[i_part]['stud_list'].max(axis=0))
+                         for i_part in part_ids])
+    is_near = ((s_ranges[None, :, :2] <= s_ranges[:, None, 2:] + 1) *
+               (s_ranges[None, :, 2:] >= s_ranges[:, None, :2] - 1)).all(axis=-1)
+
+    # only part2 below part1 (stud contact) or next to it (side contact) can
+    # result in widened cavities or contact pairs
+    is_relevant = ~is_top * (is_bot + is_side) * is_near
+    np.fill_diagonal(is_relevant, False)
+
+    # check two relevant parts each and fill the dict_widen dictionary and the cont list
+    for k, k_part in enumerate(part_ids):
+        list_temp = [(part_ids[i], check_two_parts(parts[k_part], parts[part_ids[i]], h_stud, b))
+                     for i in np.nonzero(is_relevant[k])[0]]
+        # flat list of the cavities that should be widened
+        dict_widen[k_part] = [cav for i_part, j in list_temp for cav in j[1]]
         # (first part, second part, faces)
-        cont_list += [[k_part, i_part, j[2][0]] for i_part, j in dic_temp.items() if j[2] != []]
+        cont_list += [[k_part, i_part] + j[2][0] for i_part, j in list_temp if j[2] != []]
         # add stud contact
-        # (contact identifyers: 'x0', 'x1', 'z0', 'z1', 'bot', 'top')
-        cont_list += [[k_part, i_part, ['bot','top']] for i_part, j in dic_temp.items() if j[-1] == 1]
+        # (contact identifyers: indices of 'bot', 'top' in `FACES`)
+        cont_list += [[k_part, i_part, 4, 5] for i_part, j in list_temp if j[-1] == 1]
+    
+    cont_list = np.array(cont_list, dtype=int).reshape(-1, 4)
     
     #with open('check-widen.json', 'w') as f:
     #    json.dump({'widen':dict_widen, 'cont_list':cont_list}, f)
@@ -406,14 +526,16 @@ def make_dir(dir_name, if_change=0, if_clear=0):
     """
     dir_abs = os.path.abspath('')
 
-    # if path does not exist: create
-    if os.path.exists(dir_name) == 0:
+    # if it exists: clear if if_clear==1
+    if if_clear and os.path.exists(dir_name):
+        shutil.rmtree(dir_name)
+
+    # create the directory (os.makedirs has no exist_ok in Python 2)
+    try:
         os.mkdir(dir_name)
-    else:
-        # if it exists: clear if if_clear==1
-        if if_clear:
-            shutil.rmtree(dir_name)
-            os.mkdir(dir_name)
+    except OSError:
+        if not os.path.isdir(dir_name):
+            raise
     dir1 = dir_abs + "/" + dir_name
 
     # change into the dir_name directory
@@ -513,25 +635,17 @@ def color_bricks(vp1,instances):
             with open('_color-file.dat', 'w') as f:
                 f.write(', '.join(col_list))
 
-    # if brick is divided into two parts, it should still have the same color
-    inst_names = instances.keys()
-    i = 0
-    cmap_dict = {inst_names[0]:(True, '#' + col_list[i], 'Default', '#' + col_list[i])}
-    i_name_temp = inst_names[0]
-    #
-    for inst_name in inst_names[1:]:
-        if inst_name[:-4] != i_name_temp[:-4]:
-            i += 1
-        cmap_dict[inst_name] = (True, '#' + col_list[i], 'Default', '#' + col_list[i])
-        i_name_temp = inst_name
+    # if brick is divided into two parts, it should still have the same color:
+    # the color index increases when the instance name (without its ending) changes
+    inst_names = list(instances.keys())
+    i_cols = np.cumsum([0] + [name1[:-4] != name0[:-4]
+                              for name0, name1 in zip(inst_names[:-1], inst_names[1:])])
+    cmap_dict = {inst_name: (True, '#' + col_list[i], 'Default', '#' + col_list[i])
+                 for inst_name, i in zip(inst_names, i_cols)}
     
     # set the color mapping
     cmap = vp1.colorMappings['Part instance']
-    vp1.setColor(colorMapping=cmap)
-    vp1.disableMultipleColors()
-    
     cmap.updateOverrides(overrides=cmap_dict)
-    cmap = vp1.colorMappings['Part instance']
     vp1.setColor(colorMapping=cmap)
     vp1.disableMultipleColors()
     return
@@ -561,14 +675,18 @@ def print_assembly(model, job_name):
     return
 
 
-def create_video(job_name):
-    """Create a video of the deformed model in the load step. The deformed
-    bricks are plotted in different colors and the mesh is not shown. Separate 
-    images are written to the subfolder `img-video` and then converted to an 
-    animated gif using `imagemagick`. The resolution of the images is set to
-    960 x 960 pixels.
+def set_video_view(job_name, view_par=None):
+    """Open the odb of the job and set up the viewport for the video images: The deformed
+    bricks are plotted in different colors without the mesh in 960 x 960 pixels.
+
+    Args:
+        job_name (str): Name of the job (and its odb file)
+        view_par (dict, optional): Parameters of a manual perspective view (`nearPlane`, `farPlane`, `width`, `height`, `cameraPosition`, `cameraUpVector`, `cameraTarget`). Defaults to None: Use the iso view and fit the model into the window.
+
+    Returns:
+        (odb, vp1): The opened odb and the viewport displaying it
     """
-    odb = session.openOdb(job_name + '.odb')
+    odb = session.openOdb(job_name + '.odb', readOnly=True)
     vp1 = session.viewports['Viewport: 1']
     vp1.setValues(displayedObject=odb)
 
@@ -579,22 +697,15 @@ def create_video(job_name):
     vp1.odbDisplay.display.setValues(plotState=(CONTOURS_ON_DEF,))
     vp1.odbDisplay.setFrame(step=0, frame=-1)
 
-    # possibility to use a manual view
-    session.View(name='User-1', nearPlane=119.04, farPlane=181.08, width=74.219, height=37.301,
-                 projection=PERSPECTIVE, cameraPosition=(102.76, -116.14, 52.059), viewOffsetY=0,
-                 cameraUpVector=(-0.34279, 0.52332, 0.78015), cameraTarget=(23.063, -2.4859, 3.6211),
-                 viewOffsetX=0, autoFit=ON)
-    
-    # for the pumpkin
-    session.View(name='User-1', nearPlane=221.05, farPlane=323.41, width=203.45, 
-                height=99.922, projection=PERSPECTIVE, cameraPosition=(104.03, 92.217, 
-                251.82), cameraUpVector=(-0.13447, 0.85535, -0.5003), cameraTarget=(31.195, 
-                36.737, -5.3113), viewOffsetX=0, viewOffsetY=0, autoFit=ON)
-    vp1.view.setValues(session.views['User-1'])
-
-    # just use the iso view and fit model into the window
-    vp1.view.setValues(session.views['Iso'])
-    vp1.view.fitView()
+    if view_par:
+        # possibility to use a manual view
+        session.View(name='User-1', projection=PERSPECTIVE, viewOffsetX=0, viewOffsetY=0,
+                     autoFit=ON, **view_par)
+        vp1.view.setValues(session.views['User-1'])
+    else:
+        # just use the iso view and fit model into the window
+        vp1.view.setValues(session.views['Iso'])
+        vp1.view.fitView()
 
     vp1.viewportAnnotationOptions.setValues(triad=OFF, state=OFF, legendBackgroundStyle=MATCH,
                                             annotations=OFF, compass=OFF, title=OFF, legend=OFF)
@@ -603,8 +714,6 @@ def create_video(job_name):
 
     session.printOptions.setValues(vpDecorations=OFF, vpBackground=ON, reduceColors=True)
     vp1.odbDisplay.commonOptions.setValues(visibleEdges=FREE)
-    # create folder for the images
-    make_dir('img-video', if_clear=1, if_change=0)
     vp1.odbDisplay.display.setValues(plotState=(DEFORMED,))
     #
     # assign colors to the bricks
@@ -612,33 +721,86 @@ def create_video(job_name):
     
     # set the rezolution of the animated gif (160*6)
     session.pngOptions.setValues(imageSize=(160*6, 160*6))
-    
-    # print png images for all frames in the load step
-    for i_frame in range(len(odb.steps['load'].frames)):
-        try:        # for implicit load
-            vp1.odbDisplay.setFrame(step=3, frame=i_frame)
-        except:     # for explicit load
-            vp1.odbDisplay.setFrame(step=0, frame=i_frame)
-        # print image to files anim-000.png, anim-002.png, ...
-        session.printToFile(fileName='img-video/anim-' + str(i_frame).zfill(3),
-                            format=PNG, canvasObjects=(vp1,))
-    
-    # new version with ffmpeg (works only ok for reducedColors=True)
-    try:
-        os.remove('anim-'+job_name+'.gif')
-    except:
-        None
-    os.system('ffmpeg -framerate 10 -i img-video/anim-%03d.png anim-'+job_name+'.gif')
+    return odb, vp1
 
-    make_dir('img-video', if_clear=1, if_change=0)
-    vp1.maximize()
-    
+
+def print_frame(vp1, i_step, i_frame, img_name):
+    """Print frame `i_frame` of the step with index `i_step` in the viewport vp1 to the png image {img_name}.png
+    """
+    vp1.odbDisplay.setFrame(step=i_step, frame=i_frame)
+    session.printToFile(fileName=img_name, format=PNG, canvasObjects=(vp1,))
     return
-    # merge the images into an animated gif: use a delay of 50 ms (-delay 5) 
-    # & repeat (-loop 0)
-    os.system('magick convert -dispose Background -delay 5 img-video/anim-*.png -loop 0 ' +
-              job_name + '-anim.gif')
+
+
+def create_video(job_name, view_par=None, keep_frames=0, n_workers=1):
+    """Create a video of the deformed model in the load step. The deformed
+    bricks are plotted in different colors and the mesh is not shown. Separate 
+    images are written to the subfolder `img-video` and then converted to an 
+    animated gif using `ffmpeg`. The resolution of the images is set to
+    960 x 960 pixels.
+
+    Args:
+        job_name (str): Name of the job (and its odb file)
+        view_par (dict, optional): Parameters of a manual perspective view (`nearPlane`, `farPlane`, `width`, `height`, `cameraPosition`, `cameraUpVector`, `cameraTarget`). Defaults to None: Use the iso view and fit the model into the window.
+        keep_frames (bool, optional): If the images of the frames in `img-video` should be kept. Defaults to 0.
+        n_workers (int, optional): Number of Abaqus CAE processes that print the images in parallel (`render_frames.py`), each needs a license. Defaults to 1.
+    """
+    # create folder for the images
     make_dir('img-video', if_clear=1, if_change=0)
+    odb, vp1 = set_video_view(job_name, view_par)
+    n_frames = len(odb.steps['load'].frames)
+    # index of the load step: 3 for implicit load (after the clamping steps), 0 for explicit load
+    i_step = list(odb.steps.keys()).index('load')
+    
+    if n_workers > 1:
+        # print the images in parallel Abaqus processes (anim-000.png, anim-001.png, ...)
+        with open('img-video/_view-par.json', 'w') as f:
+            json.dump(view_par, f)
+        procs = [subprocess.Popen('abaqus cae noGUI="' + os.path.join(DIR0, 'render_frames.py') + '" -- ' +
+                                  ' '.join([job_name, str(i_frames[0]), str(i_frames[-1] + 1), '"' + DIR0 + '"']),
+                                  shell=True)
+                 for i_frames in np.array_split(np.arange(n_frames), n_workers) if len(i_frames) > 0]
+        for proc in procs:
+            proc.wait()
+        
+        if which('ffmpeg'):
+            os.system('ffmpeg -y -loglevel error -framerate 10 -i img-video/anim-%03d.png anim-' +
+                      job_name + '.gif')
+        else:
+            print('ffmpeg not found: the images are kept in img-video')
+            keep_frames = 1
+    else:
+        # ffmpeg reads the images from a pipe while they are printed (works only ok
+        # for reducedColors=True), without ffmpeg the images are kept
+        if which('ffmpeg'):
+            ffmpeg = subprocess.Popen(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'image2pipe',
+                                       '-framerate', '10', '-i', '-', 'anim-' + job_name + '.gif'],
+                                      stdin=subprocess.PIPE)
+        else:
+            print('ffmpeg not found: the images are kept in img-video')
+            ffmpeg = None
+            keep_frames = 1
+
+        # print png images for all frames in the load step
+        for i_frame in range(n_frames):
+            # print image to files anim-000.png, anim-001.png, ... (or overwrite anim.png)
+            if keep_frames:
+                img_name = 'img-video/anim-' + str(i_frame).zfill(3)
+            else:
+                img_name = 'img-video/anim'
+            print_frame(vp1, i_step, i_frame, img_name)
+
+            # pass the image on to ffmpeg
+            if ffmpeg:
+                with open(img_name + '.png', 'rb') as f:
+                    ffmpeg.stdin.write(f.read())
+        
+        if ffmpeg:
+            ffmpeg.stdin.close()
+            ffmpeg.wait()
+
+    if not keep_frames:
+        make_dir('img-video', if_clear=1, if_change=0)
     vp1.maximize()
     return
 
@@ -658,28 +820,26 @@ def get_ho(job_name):
     hr_node = [hr for hr in step1.historyRegions.values() if 'Node' in hr.name]
 
     # go through the reference point history regions and load the history output
+    # (all outputs of a region at once as array of shape (n_ho, n_time, 2))
     for i_hr, hr in enumerate(hr_node):
-        ho_dic = {}
-        ho_dic['time'] = np.array(hr.historyOutputs.values()[0].data)[:, 0]
-        for ho_name, ho in hr.historyOutputs.items():
-            ho_dic[ho_name] = np.array(ho.data)[:, 1]
+        ho_names = hr.historyOutputs.keys()
+        ho_data = np.array([hr.historyOutputs[ho_name].data for ho_name in ho_names])
         # write results to dat file
         with open(job_name + '-ho-node' + str(i_hr).zfill(2) + '.dat', 'w') as f:
-            f.write(', '.join(ho_dic.keys()) + '\n')
-            np.savetxt(f, np.column_stack(ho_dic.values()), delimiter=', ')
+            f.write(', '.join(['time'] + list(ho_names)) + '\n')
+            np.savetxt(f, np.column_stack((ho_data[0, :, 0], ho_data[:, :, 1].T)), delimiter=', ',
+                       fmt=HO_FMT)
 
     # access energy in the model
     hr_ass = [hr for hr in step1.historyRegions.values() if 'ASSEMBLY' in hr.name][0]
-    ho_ass = np.column_stack((np.array(hr_ass.historyOutputs['ALLSE'].data)[:,0],
-                              np.array(hr_ass.historyOutputs['ALLSE'].data)[:,1],
-                              np.array(hr_ass.historyOutputs['ALLKE'].data)[:,1],
-                              np.array(hr_ass.historyOutputs['ALLWK'].data)[:,1],
-                              np.array(hr_ass.historyOutputs['ALLFD'].data)[:,1]))
+    ho_data = np.array([hr_ass.historyOutputs[ho_name].data
+                        for ho_name in ('ALLSE', 'ALLKE', 'ALLWK', 'ALLFD')])
+    ho_ass = np.column_stack((ho_data[0, :, 0], ho_data[:, :, 1].T))
 
     # write energies to .dat file
     with open(job_name + '-ho-ass.dat', 'w') as f:
         f.write('time, ALLSE, ALLKE, ALLWK, ALLFD\n')
-        np.savetxt(f, ho_ass, delimiter=', ')
+        np.savetxt(f, ho_ass, delimiter=', ', fmt=HO_FMT)
     return
 
 
@@ -726,16 +886,22 @@ def make_rigid_part(model, i_rigid, rigid_par, mesh_size):
     ass = model.rootAssembly
     inst_rigid = ass.Instance(name=p_name, part=p_rigid, dependent=ON)
     
+    # the center of the part is moved to `loc`: for the cylinder, first rotate it into
+    # direction `dir`, then translate it with its rotated center (0, 0, len/2) considered
+    center = (0, 0, 0)
     if rigid_par['shape'] == 'cyl':
-        ass.translate(instanceList=(p_name,), vector=(0, 0, -rigid_par['len'] / 2.))
+        center = (0, 0, rigid_par['len'] / 2.)
         if rigid_par['dir'] == (0, 1, 0):
             ass.rotate(instanceList=(p_name,), axisPoint=(0, 0, 0),
                      axisDirection=(1, 0, 0), angle=90)
+            center = (0, -rigid_par['len'] / 2., 0)
         elif rigid_par['dir'] == (1, 0, 0):
             ass.rotate(instanceList=(p_name,), axisPoint=(0, 0, 0),
                      axisDirection=(0, 1, 0), angle=90)
+            center = (rigid_par['len'] / 2., 0, 0)
     
-    ass.translate(instanceList=(inst_rigid.name,), vector=rigid_par['loc'])
+    ass.translate(instanceList=(inst_rigid.name,),
+                  vector=tuple((np.array(rigid_par['loc'], dtype=float) - center).tolist()))
 
     # define RP set and the contact surface
     p_rigid.Set(name='RP', referencePoints=(p_rigid.referencePoints[rp.id],))
@@ -743,11 +909,15 @@ def make_rigid_part(model, i_rigid, rigid_par, mesh_size):
 
     # apply mass in reference point
     if 'm' in rigid_par.keys():
+        # principal moments of inertia of a solid cylinder (axis in local z direction)
+        # or a solid sphere about their centers
+        m, r = rigid_par['m'], rigid_par['radius']
         if rigid_par['shape'] == 'cyl':
-            i11 = 0.5*rigid_par['m']*rigid_par['radius']**2
-            i22, i33 = 1/12.*rigid_par['m']*rigid_par['len']**2
+            i_principal = m * np.array([(3*r**2 + rigid_par['len']**2) / 12.,
+                                        (3*r**2 + rigid_par['len']**2) / 12., r**2 / 2.])
         else:
-            i11, i22, i33 = [2/5.*rigid_par['m']*rigid_par['radius']**2]*3
+            i_principal = np.full(3, 2/5. * m * r**2)
+        i11, i22, i33 = i_principal.tolist()
         
         p_rigid.engineeringFeatures.PointMassInertia(name='Inertia-1', region=p_rigid.sets['RP'],
                                                      mass=rigid_par['m'], i11=i11, i22=i22, i33=i33, 
@@ -763,24 +933,25 @@ def make_contact(model, mu, pos_dict={}, cont_pairs=[], is_expl=1, if_aug_lag=0)
         model (Abaqus model)
         mu (float): The friction coefficient (both static and dynamic)
         pos_dict (dict, optional): Dictionary that defines the Lego brick positions. Defaults to {}.
-        cont_pairs (list, optional): [n1,n2,[str_1,str_2]],...] with n1 and n2 the instance numbers of the bricks and str_1 and str_2 the surface names for the contact. Only relevant for is_expl==0. Defaults to [].
+        cont_pairs (ndarray, optional): Rows [n1,n2,i_face1,i_face2] with n1 and n2 the instance numbers of the bricks and i_face1 and i_face2 the indices of the surface names in `FACES` for the contact. Only relevant for is_expl==0. Defaults to [].
         is_expl (int, optional): If the model is explicit (1) or implicit (0). Defaults to 1.
         if_aug_lag (int, optional): If 1, use Augumented Lagrange contact with default properties. Otherwise, Penalty Contact is used. Defaults to 0.
     
+    Returns:
+        str: For is_expl==0, the `*Contact Pair` keywords of all interactions that should be inserted into the model data using `insert_contact_keywords`. Otherwise an empty string.
+
     Example:
-        cont_pairs : [[1, 2, ['x1', 'x0']], [1, 5, ['bot', 'top']], [2, 3, ['x1', 'x0']], [2, 5, ['bot', 'top']], [2, 6, ['bot', 'top']],]]
+        cont_pairs : [[1, 2, 1, 0], [1, 5, 4, 5], [2, 3, 1, 0], [2, 5, 4, 5], [2, 6, 4, 5]]
     """
+    cont_lines = []
+
     def make_std_interaction(model,name,s1,s2,ip='cont-prop'):
-        """Create the interaction, keywords have changed in Abaqus versions
+        """Collect the interaction (s1: main, s2: secondary surface as (instance, surface name)) 
+        as `*Contact Pair` keyword: much faster than creating each interaction in Abaqus CAE
         """
-        try:
-            # earlier Abaqus versions
-            model.SurfaceToSurfaceContactStd(name=name, createStepName='contact', master=s1, slave=s2,
-                                             sliding=FINITE, interactionProperty=ip)
-        except:
-            # Abaqus version 2022: master/slave is called main/secondary
-            model.SurfaceToSurfaceContactStd(name=name, createStepName='contact', main=s1, secondary=s2,
-                                             sliding=FINITE, interactionProperty=ip)
+        cont_lines.append('** Interaction: ' + name)
+        cont_lines.append('*Contact Pair, interaction=' + ip + ', type=SURFACE TO SURFACE')
+        cont_lines.append(s2[0].name + '.' + s2[1] + ', ' + s1[0].name + '.' + s1[1])
         return
 
     # make contact properties
@@ -807,54 +978,98 @@ def make_contact(model, mu, pos_dict={}, cont_pairs=[], is_expl=1, if_aug_lag=0)
     else:
         # use cont_pairs. if pos_dict[i_inst2]['instance'][0] == pos_dict[i_inst2]['instance'][1]: 
         # side cont only once, otherwise twice!!
-        for i_1, i_2, (str_1, str_2) in cont_pairs:
+        for i_1, i_2, i_face1, i_face2 in np.asarray(cont_pairs).tolist():
+            str_1, str_2 = FACES[i_face1], FACES[i_face2]
             inst_1_bot, inst_1_top = pos_dict[i_1]['instance']
             inst_2_bot, inst_2_top = pos_dict[i_2]['instance']
             #
             if str_1 == 'bot':
-                make_std_interaction(model, 'cont-bt-'+str(i_1)+'-'+str(i_2), inst_2_top.surfaces['contact-top'],
-                                     inst_1_bot.surfaces['contact-bot'])
+                make_std_interaction(model, 'cont-bt-'+str(i_1)+'-'+str(i_2), (inst_2_top, 'contact-top'),
+                                     (inst_1_bot, 'contact-bot'))
             else:
                 # side contact: x,z. Gets weird for 2-part bricks: 4 contact combinations
-                make_std_interaction(model, 'cont-side-'+str(i_1)+'-'+str(i_2)+'bb', inst_1_bot.surfaces[str_1],
-                                     inst_2_bot.surfaces[str_2])
+                make_std_interaction(model, 'cont-side-'+str(i_1)+'-'+str(i_2)+'bb', (inst_1_bot, str_1),
+                                     (inst_2_bot, str_2))
                 if inst_1_bot != inst_1_top:
                     make_std_interaction(model, 'cont-side-' + str(i_1) + '-' + str(i_2)+'tb',
-                                         inst_1_top.surfaces[str_1], inst_2_bot.surfaces[str_2])
+                                         (inst_1_top, str_1), (inst_2_bot, str_2))
                     if inst_2_bot != inst_2_top:
                         make_std_interaction(model, 'cont-side-' + str(i_1) + '-' + str(i_2)+'tt',
-                                             inst_1_top.surfaces[str_1], inst_2_top.surfaces[str_2])
+                                             (inst_1_top, str_1), (inst_2_top, str_2))
                 if inst_2_bot != inst_2_top:
                     make_std_interaction(model, 'cont-side-' + str(i_1) + '-' + str(i_2)+'bt',
-                                         inst_1_bot.surfaces[str_1], inst_2_top.surfaces[str_2])
+                                         (inst_1_bot, str_1), (inst_2_top, str_2))
+    return '\n'.join(cont_lines)
+
+
+def insert_contact_keywords(model, keywords, step_remove, step_add):
+    """Insert the `*Contact Pair` keywords into the model data of the input file (Abaqus/Standard does not accept them in a step). The pairs are removed in the step `step_remove` and added again in the step `step_add` using `*Model Change`, so they are only active from `step_add` on. Should be called after all other changes of the model in Abaqus CAE.
+
+    Args:
+        model (Abaqus model)
+        keywords (str): `*Contact Pair` keyword lines from `make_contact`
+        step_remove (str): Name of the step where the contact pairs are inactive
+        step_add (str): Name of the step where the contact pairs become active
+    """
+    if keywords == '':
+        return
+    
+    # data lines of the *Model Change keywords: the surfaces of each contact pair
+    pair_lines = '\n'.join(line for line in keywords.split('\n') if not line.startswith('*'))
+    
+    kw_block = model.keywordBlock
+    kw_block.synchVersions(storeNodesAndElements=False)
+    blocks = [block.lower() for block in kw_block.sieBlocks]
+
+    def get_end_step(step_name):
+        # index of the *End Step block of the step
+        i_step = [i for i, block in enumerate(blocks)
+                  if block.startswith('*step, name=' + step_name.lower() + ',')][0]
+        return [i for i, block in enumerate(blocks) if i > i_step and block.startswith('*end step')][0]
+
+    # insert from the end of the file, so the block indices before stay valid
+    i_blocks = sorted([(get_end_step(step_add), '*Model Change, type=CONTACT PAIR, add\n' + pair_lines),
+                       (get_end_step(step_remove), '*Model Change, type=CONTACT PAIR, remove\n' + pair_lines),
+                       ([i for i, block in enumerate(blocks) if block.startswith('*step')][0],
+                        '** INTERACTIONS\n' + keywords)], reverse=True)
+    for i_block, kw_str in i_blocks:
+        kw_block.insert(i_block - 1, kw_str)
     return
 
 
 def make_sections(model, mat_props):
     """
-    Create linear elastic material with (Young's modulus E,Poisson's ratio nu, density) = mat_props. Create and assign solid section to all parts in the model.
+    Create linear elastic material with (Young's modulus E,Poisson's ratio nu, density) = mat_props. Create the solid section `ABS` that is assigned to the parts in `make_abq_brick`.
     """
     # create the lin.elastic material for ABS
     mat = model.Material(name='ABS')
     mat.Elastic(table=(mat_props[:2],))
     mat.Density(table=((mat_props[-1],),))
 
-    # define solid section and assign to all parts
+    # define solid section
     model.HomogeneousSolidSection(name='ABS', material='ABS',
                                   thickness=None)
-    for p in model.parts.values():
-        p.SectionAssignment(region=p.sets['all'], sectionName='ABS',
-                            thicknessAssignment=FROM_SECTION)
     return
 
 
 def load_impl_to_expl(model, job_name):
     """
-    Load the deformed parts of the initial implicit model with result files `job_name` to the model `model` and create instances from the loaded parts. Returns the list `inst_names` that contains all instance names.
+    Load the deformed parts of the initial implicit model with result files `job_name` to the model `model` and create instances from the loaded parts. Returns the list `inst_names` that contains all instance names. If the parts have already been loaded into another explicit model (several explicit loads), they are copied from there.
     """
-    # open odb and obtain names of all instances (no assembly stuff like RP, then the model crashes)
-    odb = session.openOdb(job_name + '.odb')
     a = model.rootAssembly
+    # the absolute path distinguishes equally named jobs in different run directories
+    odb_path = os.path.abspath(job_name + '.odb')
+    model_src, inst_names = ODB_PARTS.get(odb_path, ('', []))
+
+    if model_src != model.name and model_src in mdb.models.keys():
+        # copy the parts that have already been loaded from the odb
+        for inst_name in inst_names:
+            p_temp = model.Part(name=inst_name, objectToCopy=mdb.models[model_src].parts[inst_name])
+            a.Instance(name=p_temp.name, part=p_temp, dependent=ON)
+        return inst_names
+
+    # open odb and obtain names of all instances (no assembly stuff like RP, then the model crashes)
+    odb = session.openOdb(odb_path)
     inst_names = [i for i in odb.rootAssembly.instances.keys() if i != 'ASSEMBLY']
     
     # load all parts and create instances out of them
@@ -864,6 +1079,7 @@ def load_impl_to_expl(model, job_name):
                                    shape=DEFORMED, step=-1, frame=-1)
         a.Instance(name=p_temp.name, part=p_temp, dependent=ON)
     odb.close()
+    ODB_PARTS[odb_path] = (model.name, inst_names)
     return inst_names
 
 
@@ -884,20 +1100,18 @@ def make_load_rps(model, loads_rp):
         # (can be either top or bottom part)
         inst_i_top = ass.instances['BRICK' + str(load_val['part_id']).zfill(2) + '-TOP']
         
-        if set_name in inst_i_top.sets.keys():
+        try:
             load_set = inst_i_top.sets[set_name]
-        else:
+        except KeyError:
             inst_i_bot = ass.instances['BRICK' + str(load_val['part_id']).zfill(2) + '-BOT']
             load_set = inst_i_bot.sets[set_name]
         
-        try:  # in the implicit model: faces exist
-            load_face = load_set.faces[0]
-            rp_position = load_face.getCentroid()[0]
-        except:  # in the explicit model: loaded mesh only has nodes and elements
+        if len(load_set.faces) > 0:  # in the implicit model: faces exist
+            rp_position = load_set.faces[0].getCentroid()[0]
+        else:  # in the explicit model: loaded mesh only has nodes and elements
+            # (one bounding box query of the elements in the set)
             elem_bb = load_set.elements.getBoundingBox()
-            rp_position = ((elem_bb['high'][0] + elem_bb['low'][0]) / 2.,
-                           (elem_bb['high'][1] + elem_bb['low'][1]) / 2.,
-                           (elem_bb['high'][2] + elem_bb['low'][2]) / 2.)
+            rp_position = tuple(((np.array(elem_bb['high']) + np.array(elem_bb['low'])) / 2.).tolist())
 
         # create RP and set out of it
         rp = ass.ReferencePoint(point=rp_position)
@@ -929,42 +1143,35 @@ def make_loads(model, assembly, explicit_par, mesh_size, t_step, is_expl=1, if_p
     #
     # rigid body constraints at studs (RPs for `loads_rp` already exist and are 
     # in sets 'RP-{i}' with i being the index of the `loads_rp` dictionary)
-    for i, load_val in assembly['loads_rp'].items():
+    #
+    # load values of all RPs (rows, nan if not stated) and where they are stated
+    rp_ids = list(assembly['loads_rp'].keys())
+    load_mat = np.array([[assembly['loads_rp'][i].get(load_str, np.nan) for load_str in LOAD_KEYS]
+                         for i in rp_ids], dtype=float).reshape(-1, len(LOAD_KEYS))
+    is_load_mat = ~np.isnan(load_mat)
+
+    def get_loads(k, fac, val_unset=UNSET):
+        """Scale all stated load values of RP k (row in `load_mat`) with fac, fill the others with val_unset (UNSET or FREED)
+        """
+        return [val if if_load else val_unset for val, if_load in zip((load_mat[k] * fac).tolist(), is_load_mat[k])]
 
-        # create lists and fill with UNSET keyword (or FREED for implicit load step)
-        load_list = [UNSET] * 6
-        load_list0 = [UNSET] * 6
-        load_list_impl = [FREED] * 6
-        #
-        for i_load, load_str in enumerate(('ux', 'uy', 'uz', 'rotx', 'roty', 'rotz')):
-            if load_str in load_val.keys():
-                load_list[i_load] = load_val[load_str]
-                load_list_impl[i_load] = load_val[load_str]
-                load_list0[i_load] = 0
-
-        def multi_load(load, fac):
-            """ Only multiply if load value is not UNSET
-            """
-            if load == UNSET:
-                return UNSET
-            else:
-                return load * fac
-        
-        step_ho = 'load'
+    for k, i in enumerate(rp_ids):
+        # fill with UNSET keyword (or FREED for implicit load step)
+        load_list0 = [0 if if_load else UNSET for if_load in is_load_mat[k]]
+        load_list_impl = get_loads(k, 1, FREED)
 
         # the RPs have already been created and are in assembly sets named 'RP-{i}'
         if is_expl and if_prestep == 0:
             if if_acc:
-                acc_fac = 2 / t_step ** 2
+                acc_list = get_loads(k, 2 / t_step ** 2)
                 model.AccelerationBC(name='load-RP-' + str(i), createStepName='load', region=ass.sets['RP-' + str(i)],
-                                     a1=multi_load(load_list[0],acc_fac), a2=multi_load(load_list[1],acc_fac),
-                                     a3=multi_load(load_list[2],acc_fac), ar1=multi_load(load_list[3],acc_fac),
-                                     ar2=multi_load(load_list[4],acc_fac), ar3=multi_load(load_list[5],acc_fac))
+                                     a1=acc_list[0], a2=acc_list[1], a3=acc_list[2],
+                                     ar1=acc_list[3], ar2=acc_list[4], ar3=acc_list[5])
             else:
+                v_list = get_loads(k, 1. / t_step)
                 model.VelocityBC(name='load-RP-' + str(i), createStepName='load', region=ass.sets['RP-' + str(i)],
-                                 v1=multi_load(load_list[0], 1/t_step), v2=multi_load(load_list[1], 1/t_step),
-                                 v3=multi_load(load_list[2], 1/t_step), vr1=multi_load(load_list[3], 1/t_step),
-                                 vr2=multi_load(load_list[4], 1/t_step), vr3=multi_load(load_list[5], 1/t_step))
+                                 v1=v_list[0], v2=v_list[1], v3=v_list[2],
+                                 vr1=v_list[3], vr2=v_list[4], vr3=v_list[5])
         else:
             # first create, than set values in step
             bc_temp = model.DisplacementBC(name='load-RP-' + str(i), createStepName='free', region=ass.sets['RP-' + str(i)],
@@ -973,18 +1180,22 @@ def make_loads(model, assembly, explicit_par, mesh_size, t_step, is_expl=1, if_p
             if is_expl == 0:
                 bc_temp.setValuesInStep(stepName='load', u1=load_list_impl[0], u2=load_list_impl[1], u3=load_list_impl[2],
                                         ur1=load_list_impl[3], ur2=load_list_impl[4], ur3=load_list_impl[5])
-            else:
-                step_ho = 'free'
-        #
+    
+    # one history output request for the RPs of all `loads_rp` (the odb still
+    # contains a separate history region for each RP)
+    if len(assembly['loads_rp']) > 0:
+        ass.Set(name='RPs', referencePoints=tuple(ass.sets['RP-' + str(i)].referencePoints[0]
+                                                  for i in assembly['loads_rp'].keys()))
         ho_var = ('U1', 'U2', 'U3', 'UR1', 'UR2', 'UR3', 'RF1', 'RF2', 'RF3', 'RM1', 'RM2', 'RM3')
         if is_expl and if_prestep == 0:
-            model.HistoryOutputRequest(name='ho-RP-' + str(i), createStepName=step_ho, numIntervals=500,
-                                       variables=ho_var,
-                                       region=ass.sets['RP-' + str(i)])
+            model.HistoryOutputRequest(name='ho-RPs', createStepName='load', numIntervals=500,
+                                       variables=ho_var, region=ass.sets['RPs'])
+        elif is_expl:
+            model.HistoryOutputRequest(name='ho-RPs', createStepName='free',
+                                       variables=ho_var, region=ass.sets['RPs'])
         else:
-            model.HistoryOutputRequest(name='ho-RP-' + str(i), createStepName=step_ho,
-                                       variables=ho_var,
-                                       region=ass.sets['RP-' + str(i)])
+            model.HistoryOutputRequest(name='ho-RPs', createStepName='load',
+                                       variables=ho_var, region=ass.sets['RPs'])
     
     # create loads on rigid bodies
     if if_prestep == 0 and is_expl:
@@ -1032,6 +1243,18 @@ def make_loads(model, assembly, explicit_par, mesh_size, t_step, is_expl=1, if_p
 
 # ABAQUS main functions -------------------------------------------------------------
 
+def get_faces(faces, i_faces):
+    """
+    Return the faces of the part with the indices `i_faces` (e.g. the difference of two face selections computed in Python) as a FaceArray, which can be used for sets and surfaces. The FaceArray is obtained in one call from an Abaqus mask string: a sequence of 32-bit hex words, the first word holding the faces 0-31.
+    """
+    i_faces = np.unique(np.asarray(i_faces, dtype=int))
+    if i_faces.size == 0:
+        return faces[0:0]
+    words = np.zeros(i_faces[-1] // 32 + 1, dtype=np.int64)
+    np.bitwise_or.at(words, i_faces // 32, np.left_shift(1, i_faces % 32))
+    return faces.getSequenceFromMask(mask=('[' + ''.join('#%x ' % i for i in words.tolist()) + ']',))
+
+
 def make_abq_brick(model, lego_geom, nz, nx, b_type, mesh_size, is_tet=1):
     """Create the part(s) for one Lego brick. If tetrahedral elements are used (is_tet==1), only one part p_top is created, for hexahedral elements, the two parts p_top, p_bot are created.
 
@@ -1099,10 +1322,10 @@ def make_abq_brick(model, lego_geom, nz, nx, b_type, mesh_size, is_tet=1):
                        type=DEFORMABLE_BODY)
     p_top.BaseSolidExtrude(depth=h_total, sketch=s_top)
 
-    # cut from top to get studs
-    t_cut = p_top.MakeSketchTransform(sketchPlane=p_top.faces.findAt(coordinates=(0, 0, h_total)),
-                                      sketchUpEdge=p_top.edges.findAt(
-                                          coordinates=(out_coord[1][0], 0, h_total)),
+    # cut from top to get studs (face and edge stay the same until the cut)
+    top_face = p_top.faces.findAt(coordinates=(0, 0, h_total))
+    top_edge = p_top.edges.findAt(coordinates=(out_coord[1][0], 0, h_total))
+    t_cut = p_top.MakeSketchTransform(sketchPlane=top_face, sketchUpEdge=top_edge,
                                       sketchPlaneSide=SIDE1, sketchOrientation=RIGHT,
                                       origin=(0, 0, 0))
     
@@ -1111,12 +1334,13 @@ def make_abq_brick(model, lego_geom, nz, nx, b_type, mesh_size, is_tet=1):
     
     # if tile, do not use circles for cut from top
     if b_type != 'tile':
-        for x in x_arr:
-            for y in z_arr:
-                s_cut.CircleByCenterPerimeter(center=(x, y), point1=(x + r_stud, y))
+        # centers and perimeter points of all studs at once (as tuples of floats)
+        stud_pos = make_stud_pos(nx, nz, b)
+        stud_perimeter = stud_pos + (r_stud, 0)
+        for center, point1 in zip(map(tuple, stud_pos.tolist()), map(tuple, stud_perimeter.tolist())):
+            s_cut.CircleByCenterPerimeter(center=center, point1=point1)
     
-    p_top.CutExtrude(sketchPlane=p_top.faces.findAt(coordinates=(0, 0, h_total)),
-                     sketchUpEdge=p_top.edges.findAt(coordinates=(out_coord[1][0], 0, h_total)),
+    p_top.CutExtrude(sketchPlane=top_face, sketchUpEdge=top_edge,
                      sketchPlaneSide=SIDE1, sketchOrientation=RIGHT, sketch=s_cut, depth=h_stud,
                      flipExtrudeDirection=OFF)
     
@@ -1133,39 +1357,36 @@ def make_abq_brick(model, lego_geom, nz, nx, b_type, mesh_size, is_tet=1):
 
     # sets and surfaces for top part
     p_top.Set(name='all', cells=p_top.cells[:])
-    p_top.Set(name='BOTTOM', faces=p_top.faces.getByBoundingBox(zMax=TOL))
-    p_top.Set(name='TOP-FACES', faces=p_top.faces.getByBoundingBox(zMin=h_stud + h_top - TOL))
+    p_top.SectionAssignment(region=p_top.sets['all'], sectionName='ABS',
+                            thicknessAssignment=FROM_SECTION)
+    # faces of the top part (no change of its topology until the cuts from bottom)
+    top_faces = p_top.faces
+    top_bottom_faces = top_faces.getByBoundingBox(zMax=TOL)
+    p_top.Set(name='BOTTOM', faces=top_bottom_faces)
+    p_top.Set(name='TOP-FACES', faces=top_faces.getByBoundingBox(zMin=h_stud + h_top - TOL))
 
     # create side surfaces of top part
-    p_top.Surface(name='x0', side1Faces=p_top.faces.getByBoundingBox(xMax=out_coord[0][0]+TOL))
-    p_top.Surface(name='x1', side1Faces=p_top.faces.getByBoundingBox(xMin=out_coord[1][0] - TOL))
-    p_top.Surface(name='z0', side1Faces=p_top.faces.getByBoundingBox(yMax=out_coord[0][1] + TOL))
-    p_top.Surface(name='z1', side1Faces=p_top.faces.getByBoundingBox(yMin=out_coord[1][1] - TOL))
+    p_top.Surface(name='x0', side1Faces=top_faces.getByBoundingBox(xMax=out_coord[0][0]+TOL))
+    p_top.Surface(name='x1', side1Faces=top_faces.getByBoundingBox(xMin=out_coord[1][0] - TOL))
+    p_top.Surface(name='z0', side1Faces=top_faces.getByBoundingBox(yMax=out_coord[0][1] + TOL))
+    p_top.Surface(name='z1', side1Faces=top_faces.getByBoundingBox(yMin=out_coord[1][1] - TOL))
 
     # if there is also a bottom part, create tie surfaces
     if not if_full_part:
-        p_top.Set(name='tie', faces=p_top.faces.getByBoundingBox(zMax=TOL))
-        p_top.Surface(name='tie', side1Faces=p_top.faces.getByBoundingBox(zMax=TOL))
+        p_top.Set(name='tie', faces=top_bottom_faces)
+        p_top.Surface(name='tie', side1Faces=top_bottom_faces)
     #
-    # create sets STUD-ij for loads_rp: i: ix and i: iz of the stud
+    # create sets STUD-ij for loads_rp: i: ix and i: iz of the stud. Get all top faces
+    # of the studs at once and assign them to the studs using a point on each face
     if b_type != 'tile':
+        stud_top_faces = top_faces.getByBoundingBox(zMin=h_total - TOL - TOL)
+        face_points = np.array([face.pointOn[0] for face in stud_top_faces])
+        i_studs = np.floor((face_points[:, :2] + b / 2.) / b).astype(int) + 1
         for i_z in range(1, nz + 1):
             for i_x in range(1, nx + 1):
-                p_top.Set(name='STUD-' + str(i_x) + str(i_z),
-                          faces=p_top.faces.getByBoundingBox(zMin=h_total - TOL - TOL,
-                                                             yMin=-b / 2 + b * (i_z - 1), yMax=-b / 2 + b * i_z,
-                                                             xMin=-b / 2 + b * (i_x - 1), xMax=-b / 2 + b * i_x))
-    
-    # create sketch for cut from bottom
-    s_bot = model.ConstrainedSketch(name='bot-' + brick_str, sheetSize=200.0)
-    s_bot.rectangle(point1=np.array(out_coord[0]) + b_wall, point2=np.array(out_coord[1]) - b_wall)
-
-    # so that this sketch exists also for the 1x1 tiles
-    model.ConstrainedSketch(name='bot-' + brick_str+'-wo-walls', objectToCopy=s_bot)
-    
-    # draw the inner walls, here!
-    # using t_rib_small, h_rib_small, t_rib_big, h_rib_big
-    # -------------------------------------------------------------
+                i_faces = [stud_top_faces[i].index for i in np.nonzero((i_studs[:, 0] == i_x) *
+                                                                       (i_studs[:, 1] == i_z))[0]]
+                p_top.Set(name='STUD-' + str(i_x) + str(i_z), faces=get_faces(top_faces, i_faces))
     
     def trim_curves(s,point_list):
         """Trim a curve at positions point_list
@@ -1174,133 +1395,179 @@ def make_abq_brick(model, lego_geom, nz, nx, b_type, mesh_size, is_tet=1):
             s.autoTrimCurve(curve1=s.geometry.findAt(point), point1=point)
         return
 
-    # the inner cylinders
-    if type(z_mid_arr) != np.ndarray:
-        if type(x_mid_arr) == np.ndarray:
+    # cut from bottom again if the height of inner walls h_rib < h-h_top (only 'regular'
+    # bricks). Check if 1xn or nx1 brick: then use h_rib_small
+    if_cut = 0
+    if b_type == 'regular':
+        if (nx == 1 and nz > 3) or (nz == 1 and nx > 3):
+            h_rib = h_rib_small
+            t_rib = t_rib_small
+            if_cut = 1
+        elif (nx > 1 and nz > 3) or (nz > 0 and nx > 3):
+            h_rib = h_rib_big
+            t_rib = t_rib_big
+            if_cut = 1
+        if_cut = if_cut and h_rib < h-h_top-TOL and t_rib != 0.
 
-            # positions for the inner walls
-            y0 = out_coord[0][1]+b_wall
-            y1 = (r_in_small**2-t_rib_small**2/4)**0.5
+    # base-plates have no cavities: no sketch for the cuts from bottom and no bottom part
+    if b_type != 'base-plate':
+        # create sketch for cut from bottom
+        s_bot = model.ConstrainedSketch(name='bot-' + brick_str, sheetSize=200.0)
+        s_bot.rectangle(point1=np.array(out_coord[0]) + b_wall, point2=np.array(out_coord[1]) - b_wall)
 
-            # nx1 brick: just the small cylinders: directly in the sketch
-            for i_x,x in enumerate(x_mid_arr):
-                s_bot.CircleByCenterPerimeter(center=(x, 0), point1=(x + r_in_small, 0))
-            
-            # save sketch seperately: for cut from bottom
-            model.ConstrainedSketch(name='bot-' + brick_str+'-wo-walls', objectToCopy=s_bot)
-            
-            # only put bottom walls when there is an even number of studs in this direction
-            if b_type == 'regular' and nx%2 == 0:
-                for i_x,x in enumerate(x_mid_arr):
-                    # draw the inner walls if their thickness != 0
-                    if (i_x-1)%2 == 0 and t_rib_small != 0.:
-                        s_bot.Line(point1=(x-t_rib_small/2,y0), point2=(x-t_rib_small/2,-y1))
-                        s_bot.Line(point1=(x+t_rib_small/2,y0), point2=(x+t_rib_small/2,-y1))
-                        s_bot.Line(point1=(x-t_rib_small/2,-y0), point2=(x-t_rib_small/2,y1))
-                        s_bot.Line(point1=(x+t_rib_small/2,-y0), point2=(x+t_rib_small/2,y1))
-                        
-                        # trim the curves of the outer line and the inner circle
-                        trim_curves(s_bot,((x,y0),(x,-y0),(x,-r_in_small),(x,r_in_small)))
-    else:
-        # 1xn brick: just the small cylinders: directly in the sketch
-        if type(x_mid_arr) != np.ndarray:
-            
-            for i_y,y in enumerate(z_mid_arr):
-                # second point of circle up because of later trim curves
-                s_bot.CircleByCenterPerimeter(center=(0, y), point1=(0, y + r_in_small))
-            
-            # save sketch seperately: for cut from bottom
-            model.ConstrainedSketch(name='bot-' + brick_str+'-wo-walls', objectToCopy=s_bot)
+        # sketch without the inner walls for the cuts from bottom: other bricks than 'regular'
+        # get no walls and are only cut before the outer rectangle is added to s_bot, so
+        # they directly use s_bot. 'regular' bricks only get a copy before drawing walls
+        # if they are cut again for the lower inner walls
+        s_bot_wo_walls = s_bot
 
-            # positions for the inner walls
-            x0 = out_coord[0][0]+b_wall
-            x1 = (r_in_small**2-t_rib_small**2/4)**0.5
-            
-            # only put bottom walls when there is an even number of studs in this direction
-            if b_type == 'regular' and nz%2 == 0:
-                for i_y,y in enumerate(z_mid_arr):
-                    # draw the inner walls if their thickness != 0
-                    if (i_y-1)%2 == 0 and t_rib_small != 0.:
-                        s_bot.Line(point1=(x0,y-t_rib_small/2), point2=(-x1,y-t_rib_small/2))
-                        s_bot.Line(point1=(x0,y+t_rib_small/2), point2=(-x1,y+t_rib_small/2))
-                        s_bot.Line(point1=(-x0,y-t_rib_small/2), point2=(x1,y-t_rib_small/2))
-                        s_bot.Line(point1=(-x0,y+t_rib_small/2), point2=(x1,y+t_rib_small/2))
-                        
-                        # trim the curves of the outer line and the inner circle
-                        trim_curves(s_bot,((x0,y),(-x0,y),(-r_in_small,y),(r_in_small,y)))
+        # draw the inner walls, here!
+        # using t_rib_small, h_rib_small, t_rib_big, h_rib_big
+        # -------------------------------------------------------------
+
+        # the inner cylinders
+        if type(z_mid_arr) != np.ndarray:
+            if type(x_mid_arr) == np.ndarray:
+
+                # positions for the inner walls
+                y0 = out_coord[0][1]+b_wall
+                y1 = (r_in_small**2-t_rib_small**2/4)**0.5
+
+                # nx1 brick: just the small cylinders: directly in the sketch
+                for i_x,x in enumerate(x_mid_arr):
+                    s_bot.CircleByCenterPerimeter(center=(x, 0), point1=(x + r_in_small, 0))
+
+                # save sketch seperately: for cut from bottom
+                if b_type == 'regular' and if_cut:
+                    s_bot_wo_walls = model.ConstrainedSketch(name='bot-' + brick_str+'-wo-walls', objectToCopy=s_bot)
+
+                # only put bottom walls when there is an even number of studs in this direction
+                if b_type == 'regular' and nx%2 == 0:
+                    for i_x,x in enumerate(x_mid_arr):
+                        # draw the inner walls if their thickness != 0
+                        if (i_x-1)%2 == 0 and t_rib_small != 0.:
+                            s_bot.Line(point1=(x-t_rib_small/2,y0), point2=(x-t_rib_small/2,-y1))
+                            s_bot.Line(point1=(x+t_rib_small/2,y0), point2=(x+t_rib_small/2,-y1))
+                            s_bot.Line(point1=(x-t_rib_small/2,-y0), point2=(x-t_rib_small/2,y1))
+                            s_bot.Line(point1=(x+t_rib_small/2,-y0), point2=(x+t_rib_small/2,y1))
+
+                            # trim the curves of the outer line and the inner circle
+                            trim_curves(s_bot,((x,y0),(x,-y0),(x,-r_in_small),(x,r_in_small)))
         else:
-            # nx>1 and nz>1: bigger part: copy the sketch first,because 
-            for i_x,x in enumerate(x_mid_arr):
+            # 1xn brick: just the small cylinders: directly in the sketch
+            if type(x_mid_arr) != np.ndarray:
+
                 for i_y,y in enumerate(z_mid_arr):
-                    # draw the inner tubes                    
-                    s_bot.CircleByCenterPerimeter(center=(x, y), point1=(x + r_in_big/2**0.5, y + r_in_big/2**0.5))
-                    s_bot.CircleByCenterPerimeter(center=(x, y), point1=(x + r_in_big - t_in_big, y))
-            
-            # save sketch seperately: for cut from bottom
-            model.ConstrainedSketch(name='bot-' + brick_str+'-wo-walls', objectToCopy=s_bot)
-            
-            if b_type == 'regular':
-                for i_x,x in enumerate(x_mid_arr):
+                    # second point of circle up because of later trim curves
+                    s_bot.CircleByCenterPerimeter(center=(0, y), point1=(0, y + r_in_small))
+
+                # save sketch seperately: for cut from bottom
+                if b_type == 'regular' and if_cut:
+                    s_bot_wo_walls = model.ConstrainedSketch(name='bot-' + brick_str+'-wo-walls', objectToCopy=s_bot)
+
+                # positions for the inner walls
+                x0 = out_coord[0][0]+b_wall
+                x1 = (r_in_small**2-t_rib_small**2/4)**0.5
+
+                # only put bottom walls when there is an even number of studs in this direction
+                if b_type == 'regular' and nz%2 == 0:
                     for i_y,y in enumerate(z_mid_arr):
-                        # outer coordinates
-                        c0 = out_coord[0][0]+b_wall
-                        c1 = (r_in_big**2-t_rib_big**2/4)**0.5
-                        xmax = out_coord[1][0]-b_wall
-                        ymax = out_coord[1][1]-b_wall        
-                        # check if the wall goes to the outer wall or to the next tube
-
-                        # only put bottom walls when there is an even number of studs in this direction
-                        if nx%2 == 0:
-                            # every second tube in x direction
-                            if (i_x-1)%2 == 0 and t_rib_big != 0.:
-                                # if bottom tube: wall to tube
-                                if i_y == 0:
-                                    s_bot.Line(point1=(x-t_rib_big/2,c0), point2=(x-t_rib_big/2,y-c1))
-                                    s_bot.Line(point1=(x+t_rib_big/2,c0), point2=(x+t_rib_big/2,y-c1))
-                                    trim_curves(s_bot,((x,c0),(x,y-r_in_big)))
-                                # if top tube: tube to wall
-                                if i_y+1 == len(z_mid_arr):
-                                    s_bot.Line(point1=(x-t_rib_big/2,y+c1), point2=(x-t_rib_big/2,ymax))
-                                    s_bot.Line(point1=(x+t_rib_big/2,y+c1), point2=(x+t_rib_big/2,ymax))
-                                    
-                                    trim_curves(s_bot,((x,y+r_in_big),(x,ymax)))
-                                else:
-                                    # if connection in the middle: tube-tube
-                                    s_bot.Line(point1=(x-t_rib_big/2,y+c1), point2=(x-t_rib_big/2,z_mid_arr[i_y+1]-c1))
-                                    s_bot.Line(point1=(x+t_rib_big/2,y+c1), point2=(x+t_rib_big/2,z_mid_arr[i_y+1]-c1))
-                                    trim_curves(s_bot,((x,y+r_in_big),(x,z_mid_arr[i_y+1]-r_in_big)))
-                        
-                        # only put bottom walls when there is an even number of studs in this direction
-                        if nz%2 == 0:
-                            # every second tube in y direction
-                            if (i_y-1)%2 == 0 and t_rib_big != 0.:
-                                # if outer left tube: wall to tube
-                                if i_x == 0:
-                                    s_bot.Line(point1=(c0,y-t_rib_big/2), point2=(x-c1,y-t_rib_big/2))
-                                    s_bot.Line(point1=(c0,y+t_rib_big/2), point2=(x-c1,y+t_rib_big/2))
-                                    trim_curves(s_bot,((c0,y),(x-r_in_big,y)))
-                                # if most right tube: tube to wall
-                                if i_x+1 == len(x_mid_arr):
-                                    s_bot.Line(point1=(x+c1,y-t_rib_big/2), point2=(xmax,y-t_rib_big/2))
-                                    s_bot.Line(point1=(x+c1,y+t_rib_big/2), point2=(xmax,y+t_rib_big/2))
-                                    trim_curves(s_bot,((xmax,y),(x+r_in_big,y)))
-                                else:
-                                    # if connection in the middle: tube-tube
-                                    s_bot.Line(point1=(x+c1,y-t_rib_big/2), point2=(x_mid_arr[i_x+1]-c1,y-t_rib_big/2))
-                                    s_bot.Line(point1=(x+c1,y+t_rib_big/2), point2=(x_mid_arr[i_x+1]-c1,y+t_rib_big/2))
-                                    trim_curves(s_bot,((x+r_in_big,y),(x_mid_arr[i_x+1]-r_in_big,y)))
-                            
-    # for extruding bottom part: add the outer rectangle to sketch
-    if not if_full_part:
-        s_bot.rectangle(point1=out_coord[0], point2=out_coord[1])
-        
+                        # draw the inner walls if their thickness != 0
+                        if (i_y-1)%2 == 0 and t_rib_small != 0.:
+                            s_bot.Line(point1=(x0,y-t_rib_small/2), point2=(-x1,y-t_rib_small/2))
+                            s_bot.Line(point1=(x0,y+t_rib_small/2), point2=(-x1,y+t_rib_small/2))
+                            s_bot.Line(point1=(-x0,y-t_rib_small/2), point2=(x1,y-t_rib_small/2))
+                            s_bot.Line(point1=(-x0,y+t_rib_small/2), point2=(x1,y+t_rib_small/2))
+
+                            # trim the curves of the outer line and the inner circle
+                            trim_curves(s_bot,((x0,y),(-x0,y),(-r_in_small,y),(r_in_small,y)))
+            else:
+                # nx>1 and nz>1: bigger part: copy the sketch first,because 
+                # draw the inner tubes: centers and perimeter points of the outer and
+                # inner circles of all tubes at once (as tuples of floats)
+                tube_pos = np.array([(x, y) for x in x_mid_arr for y in z_mid_arr])
+                tube_out = tube_pos + r_in_big/2**0.5
+                tube_in = tube_pos + (r_in_big - t_in_big, 0)
+                for center, point_out, point_in in zip(map(tuple, tube_pos.tolist()), map(tuple, tube_out.tolist()),
+                                                       map(tuple, tube_in.tolist())):
+                    s_bot.CircleByCenterPerimeter(center=center, point1=point_out)
+                    s_bot.CircleByCenterPerimeter(center=center, point1=point_in)
+
+                # save sketch seperately: for cut from bottom
+                if b_type == 'regular' and if_cut:
+                    s_bot_wo_walls = model.ConstrainedSketch(name='bot-' + brick_str+'-wo-walls', objectToCopy=s_bot)
+
+                if b_type == 'regular':
+                    # outer coordinates
+                    c0 = out_coord[0][0]+b_wall
+                    c1 = (r_in_big**2-t_rib_big**2/4)**0.5
+                    xmax = out_coord[1][0]-b_wall
+                    ymax = out_coord[1][1]-b_wall
+
+                    # walls at every second tube (position wall_pos), along the wall the segments go
+                    # from the outer wall to the first tube, from tube to tube and from the last tube
+                    # to the outer wall (tube coordinates along the wall tube_c). Only put bottom walls when there
+                    # is an even number of studs in this direction
+                    wall_list = []
+                    if nx%2 == 0 and t_rib_big != 0.:
+                        wall_list.append((x_mid_arr[(np.arange(len(x_mid_arr))-1)%2 == 0], z_mid_arr, ymax, 0))
+                    if nz%2 == 0 and t_rib_big != 0.:
+                        wall_list.append((z_mid_arr[(np.arange(len(z_mid_arr))-1)%2 == 0], x_mid_arr, xmax, 1))
+
+                    for wall_pos, tube_c, c_max, if_flip in wall_list:
+                        # start and end points of the segments along the wall and the trim points
+                        # on the outer wall and on the tubes
+                        seg_arr = np.column_stack((np.append(c0, tube_c + c1), np.append(tube_c - c1, c_max),
+                                                   np.append(c0, tube_c + r_in_big), np.append(tube_c - r_in_big, c_max)))
+                        # coordinates (wall, along wall) of all points: (i_wall, i_seg, [p1, p2, trim1, trim2], 2)
+                        pts = np.zeros((len(wall_pos), len(seg_arr), 4, 2))
+                        pts[:, :, :, 0] = wall_pos[:, None, None]
+                        pts[:, :, :, 1] = seg_arr[None, :, :]
+                        if if_flip:
+                            pts = pts[:, :, :, ::-1]
+                        pts = pts.reshape(-1, 4, 2)
+                        # the two lines of each wall segment: shifted by -+t_rib_big/2 across the wall
+                        d_side = np.zeros(2)
+                        d_side[if_flip] = t_rib_big/2
+                        lines = pts[:, None, :2, :] + np.array((-1., 1.))[None, :, None, None] * d_side
+
+                        for line_pair, trim_pts in zip(lines.tolist(), pts[:, 2:].tolist()):
+                            for p1, p2 in line_pair:
+                                s_bot.Line(point1=tuple(p1), point2=tuple(p2))
+                            trim_curves(s_bot, [tuple(point) for point in trim_pts])
+
+        # for extruding bottom part: add the outer rectangle to sketch
+        if not if_full_part:
+            s_bot.rectangle(point1=out_coord[0], point2=out_coord[1])
+
+    def partition_z(p, offsets):
+        """Partition all cells of part p by xy planes at the heights offsets
+        """
+        for offset in offsets:
+            datum = p.DatumPlaneByPrincipalPlane(offset=offset, principalPlane=XYPLANE)
+            p.PartitionCellByDatumPlane(cells=p.cells[:], datumPlane=p.datums[datum.id])
+        return
+
+    def mirror_x(s):
+        """Mirror all geometry of sketch s at the x axis (sketches on the bottom face)
+        """
+        s.mirror(mirrorLine=s.ConstructionLine(point1=(0, 0), point2=(1, 0)),
+                 objectList=tuple(s.geometry.values()))
+        return
+
+    # heights of the partitions of the top and bottom part: all partitions of a part
+    # are done after all cuts, so the cuts do not have to cut partitioned cells
+    top_offsets = []
+    bot_offsets = []
+
     # use the sketch for cut from bottom if there is only one part
     if if_full_part:
         if b_type != 'base-plate':
             # make a sketch for the bottom face and load the cut from 
             # bottom sketch from above
-            t = p_top.MakeSketchTransform(sketchPlane=p_top.faces.findAt(coordinates=(TOL, TOL, 0)),
-                                      sketchUpEdge=p_top.edges.findAt(coordinates=(out_coord[1][0], -TOL, 0)),
+            bot_face = p_top.faces.findAt(coordinates=(TOL, TOL, 0))
+            bot_edge = p_top.edges.findAt(coordinates=(out_coord[1][0], -TOL, 0))
+            t = p_top.MakeSketchTransform(sketchPlane=bot_face, sketchUpEdge=bot_edge,
                                       sketchPlaneSide=SIDE1, sketchOrientation=RIGHT, origin=(0,0,0))
             s_cut = model.ConstrainedSketch(name='bot-' + brick_str + '-cut', sheetSize=200.0, transform=t)
             
@@ -1308,26 +1575,21 @@ def make_abq_brick(model, lego_geom, nz, nx, b_type, mesh_size, is_tet=1):
             if b_type == 'regular':
                 s_cut.retrieveSketch(sketch=s_bot)
             else:
-                s_cut.retrieveSketch(sketch=model.sketches['bot-' + brick_str+'-wo-walls'])
+                s_cut.retrieveSketch(sketch=s_bot_wo_walls)
             #
-            g = s_cut.geometry
-            hl = s_cut.ConstructionLine(point1=(0, 0), point2=(1, 0))
-            s_cut.mirror(mirrorLine=hl, objectList=g.values())
+            mirror_x(s_cut)
 
             # cut from bottom
-            p_top.CutExtrude(sketchPlane=p_top.faces.findAt(coordinates=(TOL, TOL, 0)),
-                         sketchUpEdge=p_top.edges.findAt(coordinates=(out_coord[1][0], -TOL, 0)),
+            p_top.CutExtrude(sketchPlane=bot_face, sketchUpEdge=bot_edge,
                          sketchPlaneSide=SIDE1, sketchOrientation=RIGHT, sketch=s_cut,
                          depth=h_total - h_stud - h_top, flipExtrudeDirection=OFF)
 
-        # partition in z direction
+        # partition in z direction (after all cuts)
         if b_type != 'base-plate':
-            cut2 = p_top.DatumPlaneByPrincipalPlane(offset=h_total - h_stud - h_top, principalPlane=XYPLANE)
-            p_top.PartitionCellByDatumPlane(cells=p_top.cells[:], datumPlane=p_top.datums[cut2.id])
+            top_offsets.append(h_total - h_stud - h_top)
 
         if b_type == 'regular':
-            cut0 = p_top.DatumPlaneByPrincipalPlane(offset=h_stud + mesh_size, principalPlane=XYPLANE)
-            p_top.PartitionCellByDatumPlane(cells=p_top.cells[:], datumPlane=p_top.datums[cut0.id])
+            top_offsets.append(h_stud + mesh_size)
     
     #print('part of type ' + b_type + ' created :-)')
     ass = model.rootAssembly
@@ -1341,13 +1603,15 @@ def make_abq_brick(model, lego_geom, nz, nx, b_type, mesh_size, is_tet=1):
         if b_type == 'regular':
             # full height h
             p_bot.BaseSolidExtrude(depth=h - h_top, sketch=s_bot)
-            p_bot.Set(name='tie', faces=p_bot.faces.getByBoundingBox(zMin=h - h_top - TOL))
-            p_bot.Surface(name='tie', side1Faces=p_bot.faces.getByBoundingBox(zMin=h - h_top - TOL))
+            tie_faces = p_bot.faces.getByBoundingBox(zMin=h - h_top - TOL)
+            p_bot.Set(name='tie', faces=tie_faces)
+            p_bot.Surface(name='tie', side1Faces=tie_faces)
         else:
             # one one third of the height for 'plate'
             p_bot.BaseSolidExtrude(depth=h / 3. - h_top, sketch=s_bot)
-            p_bot.Set(name='tie', faces=p_bot.faces.getByBoundingBox(zMin=h / 3. - h_top - TOL))
-            p_bot.Surface(name='tie', side1Faces=p_bot.faces.getByBoundingBox(zMin=h / 3. - h_top - TOL))
+            tie_faces = p_bot.faces.getByBoundingBox(zMin=h / 3. - h_top - TOL)
+            p_bot.Set(name='tie', faces=tie_faces)
+            p_bot.Surface(name='tie', side1Faces=tie_faces)
     
     # only bricks can have walls in lowe cavities
     if b_type == 'regular':
@@ -1357,38 +1621,29 @@ def make_abq_brick(model, lego_geom, nz, nx, b_type, mesh_size, is_tet=1):
         else:
             p_cut = p_bot
 
-        if_cut = 0
-
-        # cut here again if the height of inner walls h < h-h_top --------------------
-        # check if 1xn or nx1 brick: then use h_rib_small
-        if (nx == 1 and nz > 3) or (nz == 1 and nx > 3):
-            h_rib = h_rib_small
-            t_rib = t_rib_small
-            if_cut = 1
-        elif (nx > 1 and nz > 3) or (nz > 0 and nx > 3):
-            h_rib = h_rib_big
-            t_rib = t_rib_big
-            if_cut = 1
-        
-        if if_cut and h_rib < h-h_top-TOL and t_rib != 0.:
-            t = p_cut.MakeSketchTransform(sketchPlane=p_cut.faces.findAt(coordinates=(out_coord[0][0]+TOL, out_coord[0][1]+TOL, 0)),
-                                    sketchUpEdge=p_cut.edges.findAt(coordinates=(out_coord[1][0], -TOL, 0)),
+        # cut here again if the height of inner walls h < h-h_top (`if_cut`, see above)
+        if if_cut:
+            bot_face = p_cut.faces.findAt(coordinates=(out_coord[0][0]+TOL, out_coord[0][1]+TOL, 0))
+            bot_edge = p_cut.edges.findAt(coordinates=(out_coord[1][0], -TOL, 0))
+            t = p_cut.MakeSketchTransform(sketchPlane=bot_face, sketchUpEdge=bot_edge,
                                     sketchPlaneSide=SIDE1, sketchOrientation=RIGHT, origin=(0,0,0))
             s_cut = model.ConstrainedSketch(name='bot-' + brick_str + '-cut2', sheetSize=200.0, transform=t)
-            s_cut.retrieveSketch(sketch=model.sketches['bot-' + brick_str+'-wo-walls'])
-            g = s_cut.geometry
-            hl = s_cut.ConstructionLine(point1=(0, 0), point2=(1, 0))
-            s_cut.mirror(mirrorLine=hl, objectList=g.values())
+            s_cut.retrieveSketch(sketch=s_bot_wo_walls)
+            mirror_x(s_cut)
 
             # cut from bottom again
-            p_cut.CutExtrude(sketchPlane=p_cut.faces.findAt(coordinates=(out_coord[0][0]+TOL, out_coord[0][1]+TOL, 0)),
-                        sketchUpEdge=p_cut.edges.findAt(coordinates=(out_coord[1][0], -TOL, 0)),
+            p_cut.CutExtrude(sketchPlane=bot_face, sketchUpEdge=bot_edge,
                         sketchPlaneSide=SIDE1, sketchOrientation=RIGHT, sketch=s_cut,
                         depth=h-h_top-h_rib, flipExtrudeDirection=OFF)
             
-            # partition in this cut plane
-            p0 = p_cut.DatumPlaneByPrincipalPlane(offset=h-h_top-h_rib, principalPlane=XYPLANE)
-            p_cut.PartitionCellByDatumPlane(cells=p_cut.cells[:], datumPlane=p_cut.datums[p0.id])
+            # partition in this cut plane (after all cuts)
+            if if_full_part:
+                top_offsets.append(h-h_top-h_rib)
+            else:
+                bot_offsets.append(h-h_top-h_rib)
+
+    # partition the top part in z direction
+    partition_z(p_top, top_offsets)
 
     # mesh the top part
     p_top.seedPart(size=mesh_size)
@@ -1413,12 +1668,14 @@ def make_abq_brick(model, lego_geom, nz, nx, b_type, mesh_size, is_tet=1):
     if not if_full_part and b_type != 'base-plate':
         # Sets and Surfaces
         p_bot.Set(name='all', cells=p_bot.cells[:])
+        p_bot.SectionAssignment(region=p_bot.sets['all'], sectionName='ABS',
+                                thicknessAssignment=FROM_SECTION)
         p_bot.Set(name='BOTTOM', faces=p_bot.faces.getByBoundingBox(zMax=TOL))
 
         # partition the bottom part (only for brick)
         if b_type == 'regular':
-            cut0 = p_bot.DatumPlaneByPrincipalPlane(offset=h_stud + mesh_size, principalPlane=XYPLANE)
-            p_bot.PartitionCellByDatumPlane(cells=p_bot.cells[:], datumPlane=p_bot.datums[cut0.id])
+            bot_offsets.append(h_stud + mesh_size)
+        partition_z(p_bot, bot_offsets)
         
         # mesh the bottom part
         p_bot.seedPart(size=mesh_size)
@@ -1433,38 +1690,34 @@ def make_abq_brick(model, lego_geom, nz, nx, b_type, mesh_size, is_tet=1):
         p_contact = p_bot
 
         # create side surfaces for bottom part
-        p_bot.Surface(name='x0', side1Faces=p_bot.faces.getByBoundingBox(xMax=out_coord[0][0] + TOL))
-        p_bot.Surface(name='x1', side1Faces=p_bot.faces.getByBoundingBox(xMin=out_coord[1][0] - TOL))
-        p_bot.Surface(name='z0', side1Faces=p_bot.faces.getByBoundingBox(yMax=out_coord[0][1] + TOL))
-        p_bot.Surface(name='z1', side1Faces=p_bot.faces.getByBoundingBox(yMin=out_coord[1][1] - TOL))
+        bot_faces = p_bot.faces
+        p_bot.Surface(name='x0', side1Faces=bot_faces.getByBoundingBox(xMax=out_coord[0][0] + TOL))
+        p_bot.Surface(name='x1', side1Faces=bot_faces.getByBoundingBox(xMin=out_coord[1][0] - TOL))
+        p_bot.Surface(name='z0', side1Faces=bot_faces.getByBoundingBox(yMax=out_coord[0][1] + TOL))
+        p_bot.Surface(name='z1', side1Faces=bot_faces.getByBoundingBox(yMin=out_coord[1][1] - TOL))
     else:
         # in only one part, the top one is used also for bottom contact
         p_bot = None
         p_contact = p_top
     
-    # create contact surface for bottom cavities
-    p_contact.Set(name='cont-bot-touch0', faces=p_contact.faces.getByBoundingBox(zMax=h_stud + mesh_size + TOL,
-                                                                         xMin=out_coord[0][0] + b_wall - TOL,
-                                                                         xMax=out_coord[1][0] - b_wall + TOL))
-    p_contact.Set(name='cont-bot-neg-widen', faces=p_contact.faces.getByBoundingBox(zMax=TOL) +
-                  p_contact.faces.getByBoundingBox(zMin=h/3.-h_top-TOL, zMax=h/3.-h_top+TOL) +
-                  p_contact.faces.getByBoundingBox(zMin=h_stud + mesh_size - TOL, zMax=h_stud + mesh_size + TOL))
-
-    p_contact.Set(name='cont-bot-neg-cont', faces=p_contact.faces.getByBoundingBox(zMax=TOL) +
-                  p_contact.faces.getByBoundingBox(zMin=h_stud + mesh_size - TOL, zMax=h_stud + mesh_size + TOL))
-
-    p_contact.SetByBoolean(name='cont-bot-touch', operation=DIFFERENCE,
-                       sets=(p_contact.sets['cont-bot-touch0'], p_contact.sets['cont-bot-neg-widen'],))
-    
-    p_contact.SetByBoolean(name='cont-bot', operation=DIFFERENCE,
-                       sets=(p_contact.sets['cont-bot-touch0'], p_contact.sets['cont-bot-neg-cont'],))
-    
-    del p_contact.sets['cont-bot-touch0']
-    del p_contact.sets['cont-bot-neg-widen']
-    del p_contact.sets['cont-bot-neg-cont']
-    
-    p_contact.Surface(name='contact-bot', side1Faces=p_contact.faces.getByBoundingBox(zMax=TOL)
-                                                     + p_contact.sets['cont-bot'].faces)
+    # create contact surface for bottom cavities (faces at the bottom and at the partition
+    # above the studs are used several times). The differences of the face selections are
+    # computed using the face indices, so no temporary sets and boolean operations are needed
+    cont_faces = p_contact.faces
+    bottom_faces = cont_faces.getByBoundingBox(zMax=TOL)
+    partition_faces = cont_faces.getByBoundingBox(zMin=h_stud + mesh_size - TOL, zMax=h_stud + mesh_size + TOL)
+    touch_faces = cont_faces.getByBoundingBox(zMax=h_stud + mesh_size + TOL,
+                                                   xMin=out_coord[0][0] + b_wall - TOL,
+                                                   xMax=out_coord[1][0] - b_wall + TOL)
+    i_neg_cont = set(face.index for face in bottom_faces) | set(face.index for face in partition_faces)
+    i_neg_widen = i_neg_cont | set(face.index for face in cont_faces.getByBoundingBox(zMin=h/3.-h_top-TOL,
+                                                                                          zMax=h/3.-h_top+TOL))
+    i_touch = [face.index for face in touch_faces]
+
+    p_contact.Set(name='cont-bot-touch', faces=get_faces(cont_faces, [i for i in i_touch if i not in i_neg_widen]))
+    p_contact.Set(name='cont-bot', faces=get_faces(cont_faces, [i for i in i_touch if i not in i_neg_cont]))
+
+    p_contact.Surface(name='contact-bot', side1Faces=bottom_faces + p_contact.sets['cont-bot'].faces)
     
     # calculate the node displacements using p,nx,ny,r_stud,h_stud
     if b_type != 'base-plate':
@@ -1499,78 +1752,77 @@ def make_assembly(assembly, lego_geom, mesh_size, is_tet):
     
     # initialize the model and change its name to model_name
     Mdb()
+    ODB_PARTS.clear()
     mdb.models.changeKey(fromName='Model-1', toName=assembly['name'])
     model = mdb.models[assembly['name']]
     
+    # material and section (assigned when creating the parts)
+    make_sections(model, lego_geom['E, nu, dens'])
+
     # create the brick parts, put the parts and their nodes to move
-    # into dictionary `brick_dict`
+    # into dictionary `brick_dict`. Bricks with the same type and size share
+    # their parts, so each of these parts is only created and meshed once
+    brick_parts = {}
     for i_brick, brick_i in brick_dict.items():
         #
         b_type, nx, nz = (brick_i['type'], brick_i['nx'], brick_i['nz'])
         dict_i = brick_dict[i_brick]
         #
-        dict_i['part'], dict_i['move_nodes'] = make_abq_brick(model, lego_geom, nz, nx, b_type,
-                                                              mesh_size, is_tet)
-    # assign sections
-    make_sections(model, lego_geom['E, nu, dens'])
+        brick_key = (b_type, nx, nz)
+        if brick_key not in brick_parts:
+            brick_parts[brick_key] = make_abq_brick(model, lego_geom, nz, nx, b_type,
+                                                    mesh_size, is_tet)
+        dict_i['part'], dict_i['move_nodes'] = brick_parts[brick_key]
     
     ass = model.rootAssembly
     
     # create all instances: one part can be used more than once
-    # ('BRICK01', 'BRICK02', ...)
+    # ('BRICK01', 'BRICK02', ...). All instances get the same rotation so that
+    # the brick lies in the x-z plane: they are rotated at once after creating
+    # them and then moved with one translation each (`inst_moves`)
+    inst_moves = []
     for i_inst, inst_i in pos_dict.items():
         # number of brick used, and its position
         i_brick, loc = (inst_i['brick_id'], inst_i['loc'])
         
-        # get brick parameters and part name from that
+        # get brick parameters and its parts (p_bot, p_top) from that
         brick_i = brick_dict[i_brick]
         b_type, nx, nz = (brick_i['type'], brick_i['nx'], brick_i['nz'])
-        brick_str = b_type + str(nz) + 'x' + str(nx)
+        p_bot, p_top = brick_i['part']
+        inst_str = 'BRICK' + str(i_inst).zfill(2)
 
-        # in `brick_dict`: (p_bot, p_top): if p_bot==None: only one part
-        if brick_i['part'][0] is None:
-            inst = ass.Instance(name='BRICK' + str(i_inst).zfill(2) + '-TOP',
-                                part=model.parts[brick_str+'-TOP'], dependent=ON)
+        # translation after the rotation: the upper left stud of the brick lies in
+        # the origin (translation (0, -b*(nz-1), 0) before the rotation), then it is
+        # moved to its position given by the user
+        loc_inst = np.array(loc, dtype=float) + (0, 0, b * (nz - 1))
+
+        # if p_bot==None: only one part
+        if p_bot is None:
+            inst = ass.Instance(name=inst_str + '-TOP', part=p_top, dependent=ON)
             
             # for use later in the interactions: top and bottom instance the same
             pos_dict[i_inst]['instance'] = (inst, inst)
 
-            # so that brick lies in the x-z plane and its upper left stud lies in the origin
-            ass.translate(instanceList=(inst.name,), vector=(0, -b*(nz-1), 0))
-            ass.rotate(instanceList=(inst.name,), axisPoint=(0, 0, 0),
-                       axisDirection=(1, 0, 0), angle=-90) 
-
-            # translate instance to its position given by the user
-            ass.translate(instanceList=(inst.name,), vector=tuple(loc))
             if b_type == 'base-plate':
-                ass.translate(instanceList=(inst.name,), vector=(0, -h_top, 0))
+                inst_moves.append((inst.name, loc_inst + (0, -h_top, 0)))
+            else:
+                inst_moves.append((inst.name, loc_inst))
         else:
             # here there are actually two parts per brick (except for base-plates)
-            i_top = ass.Instance(name='BRICK' + str(i_inst).zfill(2) + '-TOP',
-                               part=model.parts[brick_str + '-TOP'], dependent=ON)
+            i_top = ass.Instance(name=inst_str + '-TOP', part=p_top, dependent=ON)
 
-            # so that brick lies in the x-z plane and its upper left stud lies in the origin
-            ass.translate(instanceList=(i_top.name,), vector=(0, -b * (nz-1), 0))
-            ass.rotate(instanceList=(i_top.name,), axisPoint=(0, 0, 0),
-                       axisDirection=(1, 0, 0), angle=-90)
-            
             # move in y direction such that bottom is at y == 0 (except for base-plate)
-            ass.translate(instanceList=(i_top.name,), vector=tuple(loc))
             if b_type == 'regular':
-                ass.translate(instanceList=(i_top.name,), vector=(0, h - h_top, 0))
+                inst_moves.append((i_top.name, loc_inst + (0, h - h_top, 0)))
             elif b_type != 'base-plate':
-                ass.translate(instanceList=(i_top.name,), vector=(0, h / 3. - h_top, 0))
+                inst_moves.append((i_top.name, loc_inst + (0, h / 3. - h_top, 0)))
+            else:
+                inst_moves.append((i_top.name, loc_inst))
             
             # base palate can have hex. elements, but does not need bottom part
             if b_type != 'base-plate':
-                i_bot = ass.Instance(name='BRICK' + str(i_inst).zfill(2) + '-BOT',
-                                   part=model.parts[brick_str + '-BOT'], dependent=ON)
-                
-                # translate bottom instance to its position
-                ass.translate(instanceList=(i_bot.name,), vector=(0, -b * (nz-1), 0))
-                ass.rotate(instanceList=(i_bot.name,), axisPoint=(0, 0, 0),
-                           axisDirection=(1, 0, 0), angle=-90)
-                ass.translate(instanceList=(i_bot.name,), vector=tuple(loc))
+                i_bot = ass.Instance(name=inst_str + '-BOT', part=p_bot, dependent=ON)
+                inst_moves.append((i_bot.name, loc_inst))
                 pos_dict[i_inst]['instance'] = (i_bot, i_top)
 
                 # tie-constraints between top and bottom instance (for hex. elements)
@@ -1580,10 +1832,17 @@ def make_assembly(assembly, lego_geom, mesh_size, is_tet):
             else:
                 # for base-plate: top and bottom instance is the same
                 pos_dict[i_inst]['instance'] = (i_top, i_top)
+
+    # rotate all instances into the x-z plane and move them to their positions
+    if inst_moves:
+        ass.rotate(instanceList=tuple(inst_name for inst_name, _ in inst_moves), axisPoint=(0, 0, 0),
+                   axisDirection=(1, 0, 0), angle=-90)
+    for inst_name, move_vec in inst_moves:
+        ass.translate(instanceList=(inst_name,), vector=tuple(move_vec.tolist()))
     return model, pos_dict
 
 
-def make_model_load(model_name0, assembly, explicit_par, t_step, if_prestep=0, nf_expl=80):
+def make_model_load(model_name0, assembly, explicit_par, t_step, if_prestep=0, nf_expl=80, if_wait=1):
     """Create either the explicit model that loads the Lego set and runs & evaluates the model (for load_par['is_expl']==1) or creates an additional implicit load step (for load_par['is_expl']==0).
 
     Args:
@@ -1593,6 +1852,7 @@ def make_model_load(model_name0, assembly, explicit_par, t_step, if_prestep=0, n
         t_step (float): Time duration of the step.
         if_prestep (int, optional): If the function is called for creating the loads in the clamping steps (`widen`, `contact`, `free`) or from the load step. Because for an explicit load, the reference points of the loads_rp should be fixed in the `free` step to avoid rigid body motion. Defaults to 0.
         nf_expl (int, optional): Number of field output frames in the explicit model. Defaults to 80.
+        if_wait (int, optional): If the explicit job should be waited for and evaluated. For `if_wait==0`, the job is only submitted and returned. Defaults to 1.
     """
     # load parameters from the input dictionaries
     mu = assembly['mu']
@@ -1658,17 +1918,15 @@ def make_model_load(model_name0, assembly, explicit_par, t_step, if_prestep=0, n
         # create the loads in the explicit model: RP of rigid bodies
         make_loads(model, assembly, explicit_par, mesh_size, t_step, is_expl=1)
         
-        # apply the boundary conditions `bc`. Try which of the both parts contains the set
-        # that should be coupled to a RP
+        # apply the boundary conditions `bc`: use the bottom instance of the brick if there
+        # is one (not for tet elements and base-plates)
+        inst_names = set(a.instances.keys())
         for i, fix_par in assembly['bc'].items():
-            if is_tet:
-                inst_i = a.instances['BRICK' + str(fix_par['part_id']).zfill(2)+'-TOP']
+            inst_str = 'BRICK' + str(fix_par['part_id']).zfill(2)
+            if not is_tet and inst_str + '-BOT' in inst_names:
+                inst_i = a.instances[inst_str + '-BOT']
             else:
-                try:
-                    inst_i = a.instances['BRICK' + str(fix_par['part_id']).zfill(2) + '-BOT']
-                except:
-                    # when base-plate
-                    inst_i = a.instances['BRICK' + str(fix_par['part_id']).zfill(2) + '-TOP']
+                inst_i = a.instances[inst_str + '-TOP']
             model.DisplacementBC(name='fix-part-' + str(i).zfill(2), createStepName='Initial',
                                  region=inst_i.sets[fix_par['set_name'].upper()], u1=0, u2=0, u3=0)
         
@@ -1677,7 +1935,12 @@ def make_model_load(model_name0, assembly, explicit_par, t_step, if_prestep=0, n
             json.dump({'explicit_par': explicit_par, 't_step': t_step}, f)
         
         # run & evaluate the explcit model
-        run_model(model, model_name)
+        # single precision only if requested (faster, but less accurate)
+        precision = SINGLE if explicit_par.get('is_single', 0) else DOUBLE_PLUS_PACK
+        job = run_model(model, model_name, n_proc=explicit_par.get('n_cpus', 4), if_wait=if_wait,
+                        precision=precision)
+        if not if_wait:
+            return job
         get_ho(model_name)
         create_video(model_name)
     else:
@@ -1726,30 +1989,44 @@ def make_model_ini(model_name, assembly, lego_geom, explicit_par, mesh_size, mu,
         # write restart request so that the explicit model can restart the analysis
         free_step.Restart(frequency=0, numberIntervals=1, overlay=OFF, timeMarks=OFF)
 
+    ass = model.rootAssembly
+
     # create the boundary conditions `bc`
     for i, fix_par in assembly['bc'].items():
         inst_i_bot, inst_i_top = pos_dict[fix_par['part_id']]['instance']
+        # the set is either in the bottom or in the top instance of the brick
         try:
-            model.DisplacementBC(name='fix-brick-' + str(i).zfill(2), createStepName='Initial',
-                                 region=inst_i_bot.sets[fix_par['set_name']], u1=0, u2=0, u3=0)
-        except:
-            model.DisplacementBC(name='fix-brick-' + str(i).zfill(2), createStepName='Initial',
-                                 region=inst_i_top.sets[fix_par['set_name']], u1=0, u2=0, u3=0)
-
-    # widen the cavities so the studs fit in there
+            fix_set = inst_i_bot.sets[fix_par['set_name']]
+        except KeyError:
+            fix_set = inst_i_top.sets[fix_par['set_name']]
+        model.DisplacementBC(name='fix-brick-' + str(i).zfill(2), createStepName='Initial',
+                             region=fix_set, u1=0, u2=0, u3=0)
+
+    # widen the cavities so the studs fit in there. The node displacements only depend
+    # on the brick, so they are grouped once per brick (`brick_id`) for all its instances
+    u_groups_brick = {}
     for i_inst in pos_dict.keys():
-        brick_i = assembly['bricks'][pos_dict[i_inst]['brick_id']]
+        brick_id = pos_dict[i_inst]['brick_id']
         inst_i_bot, inst_i_top = pos_dict[i_inst]['instance']
 
         # only widen bricks where at least one stud is sticking (from `widen_cav`)
         if len(widen_cav[i_inst]) > 0:
-            move_nodes = brick_i['move_nodes']
-            for n_label_i, dr_i, ang_i in move_nodes:
-                n_label = int(n_label_i)
+            if brick_id not in u_groups_brick:
+                move_nodes = assembly['bricks'][brick_id]['move_nodes']
                 # get cartesian coordinates from angular and radial displacement
-                ux, uz = dr_i * np.cos(ang_i * np.pi / 180.), -dr_i * np.sin(ang_i * np.pi / 180.)
-                bc_temp = model.DisplacementBC(name='u0-inst' + str(i_inst) + 'n' + str(n_label),
-                                               createStepName='widen', region=inst_i_bot.sets['x-n' + str(n_label)],
+                ux_arr = move_nodes[:, 1] * np.cos(move_nodes[:, 2] * np.pi / 180.)
+                uz_arr = -move_nodes[:, 1] * np.sin(move_nodes[:, 2] * np.pi / 180.)
+
+                # nodes with the same displacement share one set and boundary condition
+                u_groups = {}
+                for n_label, ux, uz in zip(move_nodes[:, 0].astype(int).tolist(), ux_arr.tolist(), uz_arr.tolist()):
+                    u_groups.setdefault((round(ux, 9), round(uz, 9)), []).append(n_label)
+                u_groups_brick[brick_id] = sorted(u_groups.items())
+
+            for i_group, ((ux, uz), n_labels) in enumerate(u_groups_brick[brick_id]):
+                set_name = 'u0-inst' + str(i_inst) + '-' + str(i_group)
+                ass.Set(name=set_name, nodes=inst_i_bot.nodes.sequenceFromLabels(n_labels))
+                bc_temp = model.DisplacementBC(name=set_name, createStepName='widen', region=ass.sets[set_name],
                                                u1=ux, u2=0, u3=uz)
                 bc_temp.deactivate('contact')
         
@@ -1762,14 +2039,18 @@ def make_model_ini(model_name, assembly, lego_geom, explicit_par, mesh_size, mu,
     print_assembly(model, model_name)
 
     # define contact & reference points for loads
-    make_contact(model, mu, pos_dict, cont_pairs, is_expl=0)
+    cont_keywords = make_contact(model, mu, pos_dict, cont_pairs, is_expl=0)
     make_load_rps(model, assembly['loads_rp'])
     
     # implicit model: already add the load step
     make_model_load(model_name, assembly, explicit_par, 1, if_prestep=1)
 
+    # add the contact pairs to the model data as keywords, active from the `contact` step on
+    # (after all other changes of the model)
+    insert_contact_keywords(model, cont_keywords, 'widen', 'contact')
+
     # run the initial model (expl.) or full model (impl.)
-    run_model(model, model_name)
+    run_model(model, model_name, n_proc=explicit_par.get('n_cpus', 4))
 
     # is_expl==0: implicit model already run and evaluated in function make_model_load
     if not is_expl:
@@ -1783,15 +2064,15 @@ def make_model(assembly0, explicit_par={}, lego_geom=lego_geom, is_new=1, n_fram
     """Creates, runs, and evaluates Lego model in Abaqus. Parameters should be given in the N-mm-s system.
 
     Args:
-        assembly0 (dict): The setup of the Lego set defining bricks used (sub-dictionary `bricks`), brick positions (`pos`), boundary conditions (`bc`), and loads applied on sets (`loads_rp`)
+        assembly0 (dict): The setup of the Lego set defining bricks used (sub-dictionary `bricks`), brick positions (`parts`), boundary conditions (`bc`), and loads applied on sets (`loads_rp`). The `parts` can also be given as the arrays {'brick_ids':..., 'locs':..., 'colors':...}, see `make_parts_dict`.
         explicit_par (dict): Dictionary that defines the load parameters in the model
         lego_geom (dict): Dictionary containing the general Lego dimensions and elastic parameters.
-        is_new (int, optional): If the implicit calculation (steps `widen`, `contact`, `free`) should be performed anew or already exists. Only relevant for an explicit load step. Defaults to 1.
+        is_new (int, optional): If the implicit calculation (steps `widen`, `contact`, `free`) should be performed anew or already exists. Only relevant for an explicit load step. If the existing results belong to a different `assembly` or `lego_geom`, they are computed anew. Defaults to 1.
         n_frames_expl (int, optional): Number of output frames in the explicit model. Defaults to 80.
     
     Examples:
         assembly0: {'name':'case0-widen', 
-                       'bricks':{1:{'type':'base-plate', 'nx':1, 'nz':1}, 2:{'type':'brick', 'nx':1, 'nz':1}},
+                       'bricks':{1:{'type':'base-plate', 'nx':1, 'nz':1}, 2:{'type':'regular', 'nx':1, 'nz':1}},
                        'parts':{1:{'brick_id':1, 'loc':(0,0,0)},
                                 2:{'brick_id':2, 'loc':(0,0,0)}},
                        'bc':{1:{'part_id':1, 'set_name':'BOTTOM'}},
@@ -1822,11 +2103,22 @@ def make_model(assembly0, explicit_par={}, lego_geom=lego_geom, is_new=1, n_fram
     # information will be written into assembly, assembly0 should stay unchanged
     assembly = copy.deepcopy(assembly0)
 
+    # the parts can also be given as arrays `brick_ids`, `locs`, and optionally `colors`
+    if 'locs' in assembly['parts']:
+        assembly['parts'] = make_parts_dict(**assembly['parts'])
+    check_assembly(assembly)
+
     solver_type = {1: 'expl', 0:'impl'}
 
     # create the name for the model directory
     run_dir = model_name + '-' + solver_type[is_expl] + '-mesh' + str(int(mesh_size * 100)).zfill(3)+'mm'
 
+    # only skip the clamping steps if their results exist for the same assembly and geometry
+    # (checked before the directory is created, so that it is cleared for new clamping steps)
+    if is_expl and not is_new and not is_ini_valid(model_name, assembly, lego_geom, run_dir):
+        print('No matching clamping results in ' + run_dir + ': run the clamping steps again')
+        is_new = 1
+
     # change into that directory
     make_dir(run_dir, if_clear=is_new, if_change=1)
 
@@ -1841,13 +2133,17 @@ def make_model(assembly0, explicit_par={}, lego_geom=lego_geom, is_new=1, n_fram
     # load the deformed and stressed Lego bricks from the implicit clamping model to the explicit model,
     # apply the loads, and run & evaluate the explicit model
     if is_expl:
-        if type(t_steps) != list:
-            # t_steps is a scalar: only call once
-            make_model_load(model_name, assembly, explicit_par, t_steps, nf_expl=n_frames_expl)
-        else:
-            # t_steps is a list: repeatedly run explicit models with varying time step length
-            for t_i in t_steps:
-                make_model_load(model_name, assembly, explicit_par, t_i, nf_expl=n_frames_expl)
+        # t_steps can be a scalar or a list: run explicit models with all time step lengths.
+        # These models are independent, so `n_parallel` jobs can run at the same time
+        t_list = [t_steps] if np.isscalar(t_steps) else list(t_steps)
+        n_parallel = explicit_par.get('n_parallel', 1)
+        for i_t in range(0, len(t_list), n_parallel):
+            jobs = [make_model_load(model_name, assembly, explicit_par, t_i, nf_expl=n_frames_expl, if_wait=0)
+                    for t_i in t_list[i_t:i_t + n_parallel]]
+            wait_for_jobs(jobs)
+            for job in jobs:
+                get_ho(job.name)
+                create_video(job.name)
     #
     remove_files(DIR0+'/'+run_dir)
     os.chdir(DIR0)
@@ -14,12 +14,12 @@ assembly_case_1 = {'name':'case-1-pull-1x1',
                    'loads_rp':{1:{'part_id':2, 'set_name':'STUD-11', 'uy':1.2}},
                    'mesh_size':0.5, 'mu':0.2}
 
-make_model(assembly_case_1)
-
 # load explicitly in a separate computation
 explicit_par_1 = {'t_step': 0.0005, 'is_acc': 0, 'mass_scale_t': 0,
                   'load_str': '', 'loads_rigid': {}}
 
-assembly_case_1['loads_rp'][1]['uy'] = 2
+if __name__ == '__main__':
+    make_model(assembly_case_1)
 
-make_model(assembly_case_1, explicit_par_1)
\ No newline at end of file
+    assembly_case_1['loads_rp'][1]['uy'] = 2
+    make_model(assembly_case_1, explicit_par_1)
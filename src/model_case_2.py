@@ -18,4 +18,5 @@ assembly_case_2 = {'name':'case-2-bend2x4',
 explicit_par_2 = {'mass_scale_t': 0, 't_step': 0.0005, 'is_acc': 0,
                   'load_str': '', 'loads_rigid': {}}
 
-make_model(assembly_case_2, explicit_par_2)
\ No newline at end of file
+if __name__ == '__main__':
+    make_model(assembly_case_2, explicit_par_2)
@@ -1,20 +1,22 @@
 """Running test case 3 of the Lego model
 """
 
+import numpy as np
 from brickfem import make_model
 
 # Case 3: tower of 2x2 bricks
 # -----------------------------------------------------------------------
+# the parts as arrays: base-plate and n_tower 2x2 bricks on top of each other
+n_tower = 6
+brick_ids = np.array([1] + [2]*n_tower)
+locs = np.zeros((n_tower + 1, 3))
+locs[1:, 1] = np.arange(n_tower) * 9.6
+colors = np.where(np.arange(n_tower + 1) % 2, 'Red', 'Yellow')
+
 assembly_case_3 = {'name':'case-3-tower6_2x2',
                   'bricks':{1:{'type':'base-plate', 'nx':2, 'nz':2},
                             2:{'type':'regular', 'nx':2, 'nz':2}},
-                  'parts':{1:{'brick_id':1, 'loc':(0,0,0), 'c':'Yellow'},
-                         2:{'brick_id':2, 'loc':(0,0,0), 'c':'Red'},
-                         3:{'brick_id':2, 'loc':(0,9.6,0), 'c':'Yellow'},
-                         4:{'brick_id':2, 'loc':(0,2*9.6,0), 'c':'Red'},
-                         5:{'brick_id':2, 'loc':(0,3*9.6,0), 'c':'Yellow'},
-                         6:{'brick_id':2, 'loc':(0,4*9.6,0), 'c':'Red'},
-                         7:{'brick_id':2, 'loc':(0,5*9.6,0), 'c':'Yellow'}},
+                  'parts':{'brick_ids':brick_ids, 'locs':locs, 'colors':colors},
                   'bc':{1:{'part_id':1, 'set_name':'BOTTOM'}},
                   'loads_rp':{}, 'mesh_size':0.75, 'mu':0.2}
 
@@ -23,8 +25,9 @@ explicit_par_3 = {'t_step': 0.0005, 'is_acc': 0, 'mass_scale_t': 0,
                   'loads_rigid': {1:{'shape':'sphere',  'loc':(-8.001,9.6*4.5,4),
                                      'radius':4., 'u':(20,0,0)}}}
 
-make_model(assembly_case_3, explicit_par_3, is_new=1)
+if __name__ == '__main__':
+    make_model(assembly_case_3, explicit_par_3, is_new=1)
 
-# same model, explicit load step with 0.2 ms instead of 0.5 ms
-explicit_par_3['t_step'] = 0.0002
-make_model(assembly_case_3, explicit_par_3, is_new=0)
+    # same model, explicit load step with 0.2 ms instead of 0.5 ms
+    explicit_par_3['t_step'] = 0.0002
+    make_model(assembly_case_3, explicit_par_3, is_new=0)
@@ -81,5 +81,8 @@ explicit_par_snowman = {
 make_model(assembly_pumpkin, explicit_par_snowman, is_new=1, n_frames_expl=100)
 
 # only video evaluation, e.g. for changed view
+view_pumpkin = {'nearPlane':221.05, 'farPlane':323.41, 'width':203.45, 'height':99.922,
+                'cameraPosition':(104.03, 92.217, 251.82), 'cameraUpVector':(-0.13447, 0.85535, -0.5003),
+                'cameraTarget':(31.195, 36.737, -5.3113)}
 #make_dir('pumpkin-expl-mesh080mm', if_clear=0, if_change=1)
-#create_video('pumpkin-40mps-15mm-001_0ms')
\ No newline at end of file
+#create_video('pumpkin-40mps-15mm-001_0ms', view_par=view_pumpkin)
\ No newline at end of file
@@ -0,0 +1,21 @@
+"""Print a range of frames of the load step to png images in `img-video`. Started by
+`create_video` for n_workers > 1 in the folder of the job:
+
+abaqus cae noGUI=render_frames.py -- job_name i_start i_end brickfem_dir
+"""
+import sys, json
+
+job_name, i_start, i_end, brickfem_dir = sys.argv[-4:]
+sys.path.insert(0, brickfem_dir)
+from brickfem import set_video_view, print_frame
+
+# manual view from `create_video` (json turns tuples into lists)
+with open('img-video/_view-par.json', 'r') as f:
+    view_par = json.load(f)
+if view_par:
+    view_par = {str(key): tuple(val) if type(val) == list else val for key, val in view_par.items()}
+
+odb, vp1 = set_video_view(job_name, view_par)
+i_step = list(odb.steps.keys()).index('load')
+for i_frame in range(int(i_start), int(i_end)):
+    print_frame(vp1, i_step, i_frame, 'img-video/anim-' + str(i_frame).zfill(3))
@@ -0,0 +1,74 @@
+"""Running the test cases 1-3 of the Lego model in parallel
+# -----------------------------------------------------------------
+Every case is an independent Abaqus CAE session that writes into its own run
+directory (named after `assembly['name']`), so the cases can be started at the
+same time. Run this file with a normal Python interpreter, `python run_all.py`,
+not with `abaqus cae nogui=...`: it only starts the `abaqus cae nogui=model_case_i.py`
+commands and waits for them to finish.
+
+Other case scripts can be given on the command line, e.g.
+`python run_all.py model_case_4.py model_pumpkin.py`, and the number of
+processors used by one case with `--n-cpus` (`n_cpus` times `n_parallel` of its
+`explicit_par`, default 4). In a job array of a cluster scheduler (environment
+variable `SLURM_ARRAY_TASK_ID`), each array task only runs the case script with
+the index of the task, counted from the first array index, e.g. `--array=1-3`
+runs the cases 1, 2, and 3.
+"""
+
+import os, sys, argparse, subprocess, multiprocessing
+from multiprocessing.pool import ThreadPool
+
+# the case scripts that should be run
+CASE_FILES = ('model_case_1.py', 'model_case_2.py', 'model_case_3.py')
+
+# default number of processors used by one case (see `n_cpus` in `explicit_par`)
+N_PROC_JOB = 4
+
+
+def run_case(case_file):
+    """Run one case script in the background using `abaqus cae nogui=...` and return its exit code.
+    """
+    # the Abaqus command is a batch file on Windows, so it needs the shell there
+    return subprocess.call('abaqus cae nogui="' + case_file + '"', shell=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_all(case_files=CASE_FILES, n_proc_job=N_PROC_JOB):
+    """Run the case scripts `case_files` at the same time. Because each Abaqus job already uses `n_proc_job` processors, at most cpu_count // n_proc_job cases are run simultaneously.
+    """
+    n_workers = max(1, min(len(case_files), multiprocessing.cpu_count() // n_proc_job))
+
+    # the threads only wait for the Abaqus processes, so a thread pool is enough
+    pool = ThreadPool(n_workers)
+    exit_codes = pool.map(run_case, case_files)
+    pool.close()
+    pool.join()
+
+    for case_file, exit_code in zip(case_files, exit_codes):
+        print(case_file + ': ' + ('finished' if exit_code == 0 else 'failed (' + str(exit_code) + ')'))
+    return exit_codes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run Lego model case scripts in parallel.')
+    parser.add_argument('case_files', nargs='*',
+                        help='case scripts to run (default: ' + ' '.join(CASE_FILES) + ')')
+    parser.add_argument('--n-cpus', type=int, default=N_PROC_JOB,
+                        help='number of processors used by one case (default: ' + str(N_PROC_JOB) + ')')
+    args = parser.parse_args()
+
+    # the cases are run from this directory, so resolve the given paths relative to the caller's directory first
+    if args.case_files:
+        case_files = tuple(os.path.abspath(case_file) for case_file in args.case_files)
+    else:
+        case_files = CASE_FILES
+
+    # array job: only run the case of this array task, counted from the first array index
+    if 'SLURM_ARRAY_TASK_ID' in os.environ:
+        i_case = int(os.environ['SLURM_ARRAY_TASK_ID']) - int(os.environ.get('SLURM_ARRAY_TASK_MIN', 0))
+        if not 0 <= i_case < len(case_files):
+            sys.exit('SLURM_ARRAY_TASK_ID ' + os.environ['SLURM_ARRAY_TASK_ID'] + ' does not match one of the '
+                     + str(len(case_files)) + ' case scripts: use an array range with ' + str(len(case_files))
+                     + ' indices, e.g. --array=0-' + str(len(case_files) - 1))
+        case_files = (case_files[i_case],)
+    run_all(case_files, n_proc_job=args.n_cpus)